@@ -1,8 +1,15 @@
+import functools
 import numpy as np
+import pandas as pd
 import geopandas as gpd
-from shapely.geometry import shape
+import shapely
 import rasterio.features
 
+@functools.lru_cache(maxsize=8)
+def _inverse_affine_coeffs(transform) -> tuple[float, float, float, float, float, float]:
+    inverse = ~transform
+    return inverse.a, inverse.b, inverse.c, inverse.d, inverse.e, inverse.f
+
 def count_flooded_buildings(buildings_gdf: gpd.GeoDataFrame, flood_mask: np.ndarray, dem_transform) -> int:
     if buildings_gdf is None or buildings_gdf.empty:
         return 0
@@ -12,39 +19,122 @@ def count_flooded_buildings(buildings_gdf: gpd.GeoDataFrame, flood_mask: np.ndar
     else:
         raise ValueError("buildings_gdf must have a valid CRS.")
 
-    flooded_count = 0
-    for geom in buildings_gdf.geometry:
-        if geom.is_empty:
-            continue
-        centroid = geom.centroid
-        col, row = ~dem_transform * (centroid.x, centroid.y)
-        row, col = int(round(row)), int(round(col))
-        if (0 <= row < flood_mask.shape[0]) and (0 <= col < flood_mask.shape[1]):
-            if flood_mask[row, col]:
-                flooded_count += 1
-    return flooded_count
+    geometries = np.asarray(buildings_gdf.geometry.values)
+    geometries = geometries[~(shapely.is_missing(geometries) | shapely.is_empty(geometries))]
+    centroids = shapely.centroid(geometries)
+    cx = shapely.get_x(centroids)
+    cy = shapely.get_y(centroids)
+
+    # Sample the mask at each centroid instead of rasterizing building ids onto the DEM
+    # grid: at DEM resolution many buildings share a cell, and an id raster keeps only one.
+    a, b, c, d, e, f = _inverse_affine_coeffs(dem_transform)
+    cols = np.rint(a * cx + b * cy + c).astype(np.int64)
+    rows = np.rint(d * cx + e * cy + f).astype(np.int64)
+
+    in_bounds = (rows >= 0) & (rows < flood_mask.shape[0]) & (cols >= 0) & (cols < flood_mask.shape[1])
+    return int(np.count_nonzero(flood_mask[rows[in_bounds], cols[in_bounds]]))
 
 def raster_to_vector_polygons(raster_array: np.ndarray, transform) -> gpd.GeoDataFrame:
     mask_int = raster_array.astype(np.uint8)
-    shapes_gen = rasterio.features.shapes(mask_int, mask=mask_int.astype(bool), transform=transform)
-    polygons = []
-    values = []
-    for geom, value in shapes_gen:
-        if value == 1:
-            polygons.append(shape(geom))
-            values.append(value)
-    gdf = gpd.GeoDataFrame({'geometry': polygons, 'value': values})
+    flooded = mask_int == 1
+    # With mask=flooded, shapes() only yields the flooded (value 1) regions.
+    shapes_gen = rasterio.features.shapes(mask_int, mask=flooded, transform=transform, connectivity=4)
+    # Gather every ring into one flat coordinate buffer and build all polygons
+    # (holes included) with a single GEOS call instead of one shape() per feature.
+    coords = []
+    ring_offsets = [0]
+    polygon_offsets = [0]
+    for geom, _ in shapes_gen:
+        for ring in geom['coordinates']:
+            coords.extend(ring)
+            ring_offsets.append(len(coords))
+        polygon_offsets.append(len(ring_offsets) - 1)
+    polygons = shapely.from_ragged_array(
+        shapely.GeometryType.POLYGON,
+        np.asarray(coords, dtype=np.float64).reshape(-1, 2),
+        (np.asarray(ring_offsets), np.asarray(polygon_offsets))
+    )
+    gdf = gpd.GeoDataFrame({'geometry': polygons, 'value': np.ones(len(polygons))})
     return gdf
 
+def _intersecting_pairs(infra_gdf: gpd.GeoDataFrame, flood_polygons_gdf: gpd.GeoDataFrame,
+                        with_intersections: bool = True):
+    if infra_gdf.crs != flood_polygons_gdf.crs:
+        flood_polygons_gdf = flood_polygons_gdf.to_crs(infra_gdf.crs)
+
+    infra_geoms = np.asarray(infra_gdf.geometry.values)
+    flood_geoms = np.asarray(flood_polygons_gdf.geometry.values)
+
+    # Only flood polygons overlapping the layer's bounding box can intersect it.
+    minx, miny, maxx, maxy = infra_gdf.total_bounds
+    flood_bounds = shapely.bounds(flood_geoms)
+    candidates = np.flatnonzero((flood_bounds[:, 0] <= maxx) & (flood_bounds[:, 2] >= minx)
+                                & (flood_bounds[:, 1] <= maxy) & (flood_bounds[:, 3] >= miny))
+
+    # STRtree evaluates predicates with the query geometries prepared, so query with the
+    # large flood polygons against a tree of infrastructure. Preparing them explicitly keeps
+    # the prepared state on the geometries for later calls (buildings, then roads). The tree
+    # is the GeoDataFrame's cached sindex, so it is built once per layer, not once per call.
+    shapely.prepare(flood_geoms[candidates])
+    candidate_idx, infra_idx = infra_gdf.sindex.query(flood_geoms[candidates], predicate='intersects')
+    flood_idx = candidates[candidate_idx]
+    order = np.lexsort((flood_idx, infra_idx))
+    infra_idx, flood_idx = infra_idx[order], flood_idx[order]
+    infra_pair_geoms = infra_geoms[infra_idx]
+    dimensions = shapely.get_dimensions(infra_pair_geoms)
+
+    # Like gpd.overlay, keep only pieces with the same dimension as the infrastructure
+    # geometry (e.g. drop the boundary points where a road merely touches a flood polygon).
+    if with_intersections:
+        intersections = shapely.intersection(infra_pair_geoms, flood_geoms[flood_idx])
+        keep = ~shapely.is_empty(intersections) & (shapely.get_dimensions(intersections) == dimensions)
+        return infra_idx[keep], flood_idx[keep], intersections[keep]
+
+    # Two polygons meet in an areal piece exactly when their interiors intersect, which
+    # the DE-9IM relation answers without building the intersection geometry.
+    keep = np.empty(len(infra_idx), dtype=bool)
+    areal = dimensions == 2
+    keep[areal] = shapely.relate_pattern(infra_pair_geoms[areal], flood_geoms[flood_idx[areal]], 'T********')
+    pieces = shapely.intersection(infra_pair_geoms[~areal], flood_geoms[flood_idx[~areal]])
+    keep[~areal] = ~shapely.is_empty(pieces) & (shapely.get_dimensions(pieces) == dimensions[~areal])
+    return infra_idx[keep], flood_idx[keep], None
+
+def find_intersecting_indices(infra_gdf: gpd.GeoDataFrame, flood_polygons_gdf: gpd.GeoDataFrame) -> np.ndarray:
+    """
+    Returns, for each row ``find_intersecting_features`` would return, the position of
+    its infrastructure row in ``infra_gdf``, without building the intersection geometries.
+
+    Use it to count or tally attributes of flooded features when the flooded pieces
+    themselves are not needed.
+    """
+    if infra_gdf is None or infra_gdf.empty or flood_polygons_gdf is None or flood_polygons_gdf.empty:
+        return np.empty(0, dtype=np.intp)
+    infra_idx, _, _ = _intersecting_pairs(infra_gdf, flood_polygons_gdf, with_intersections=False)
+    return infra_idx
+
 def find_intersecting_features(infra_gdf: gpd.GeoDataFrame, flood_polygons_gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """
+    Returns one row per intersecting (infrastructure, flood polygon) pair, holding the
+    intersection geometry and the attributes of both rows.
+
+    The inputs are neither copied nor modified. The result has a fresh RangeIndex, so
+    callers must not rely on it matching the index of ``infra_gdf``.
+    """
     if infra_gdf is None or infra_gdf.empty or flood_polygons_gdf is None or flood_polygons_gdf.empty:
         return gpd.GeoDataFrame(columns=infra_gdf.columns)
 
-    if infra_gdf.crs != flood_polygons_gdf.crs:
-        flood_polygons_gdf = flood_polygons_gdf.to_crs(infra_gdf.crs)
+    infra_idx, flood_idx, intersections = _intersecting_pairs(infra_gdf, flood_polygons_gdf)
 
-    infra_gdf = infra_gdf.copy().reset_index(drop=True)
-    flood_polygons_gdf = flood_polygons_gdf.copy().reset_index(drop=True)
+    infra_attrs = infra_gdf.drop(columns=infra_gdf.geometry.name).iloc[infra_idx]
+    flood_attrs = flood_polygons_gdf.drop(columns=flood_polygons_gdf.geometry.name).iloc[flood_idx]
+    shared = infra_attrs.columns.intersection(flood_attrs.columns)
+    if len(shared) > 0:
+        infra_attrs = infra_attrs.rename(columns={c: f"{c}_1" for c in shared})
+        flood_attrs = flood_attrs.rename(columns={c: f"{c}_2" for c in shared})
 
-    intersecting_gdf = gpd.overlay(infra_gdf, flood_polygons_gdf, how='intersection')
+    intersecting_gdf = gpd.GeoDataFrame(
+        pd.concat([infra_attrs.reset_index(drop=True), flood_attrs.reset_index(drop=True)], axis=1),
+        geometry=intersections,
+        crs=infra_gdf.crs
+    )
     return intersecting_gdf
@@ -0,0 +1,127 @@
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    # Numba is optional: without it the kernels below run as plain Python,
+    # which gives identical results but is only practical for small DEMs.
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _heap_push(keys, cells, size, key, cell):
+    i = size
+    keys[i] = key
+    cells[i] = cell
+    while i > 0:
+        parent = (i - 1) // 2
+        if keys[parent] <= keys[i]:
+            break
+        keys[parent], keys[i] = keys[i], keys[parent]
+        cells[parent], cells[i] = cells[i], cells[parent]
+        i = parent
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(keys, cells, size):
+    top = cells[0]
+    size -= 1
+    keys[0] = keys[size]
+    cells[0] = cells[size]
+    i = 0
+    while True:
+        left = 2 * i + 1
+        if left >= size:
+            break
+        child = left
+        if left + 1 < size and keys[left + 1] < keys[left]:
+            child = left + 1
+        if keys[i] <= keys[child]:
+            break
+        keys[child], keys[i] = keys[i], keys[child]
+        cells[child], cells[i] = cells[i], cells[child]
+        i = child
+    return top, size
+
+
+@njit(cache=True)
+def priority_flood_levels(dem):
+    """
+    Improved priority-flood (Barnes et al., 2014) seeded from every edge cell.
+
+    Returns, for each cell, the lowest water level at which it is connected to the
+    DEM edge through cells at or below that level. NaN elevations never flood.
+    """
+    rows, cols = dem.shape
+    size = rows * cols
+    elevations = dem.ravel()
+    levels = np.empty(size, dtype=dem.dtype)
+    closed = np.zeros(size, dtype=np.bool_)
+
+    heap_keys = np.empty(size, dtype=dem.dtype)
+    heap_cells = np.empty(size, dtype=np.int64)
+    heap_size = 0
+    pit_cells = np.empty(size, dtype=np.int64)
+    pit_size = 0
+
+    for r in range(rows):
+        for c in range(cols):
+            if r != 0 and r != rows - 1 and c != 0 and c != cols - 1:
+                continue
+            cell = r * cols + c
+            level = elevations[cell]
+            if np.isnan(level):
+                level = np.inf
+            closed[cell] = True
+            levels[cell] = level
+            heap_size = _heap_push(heap_keys, heap_cells, heap_size, level, cell)
+
+    while heap_size > 0 or pit_size > 0:
+        # Cells inside a depression share their spill level, so they skip the heap.
+        if pit_size > 0:
+            pit_size -= 1
+            cell = pit_cells[pit_size]
+        else:
+            cell, heap_size = _heap_pop(heap_keys, heap_cells, heap_size)
+        level = levels[cell]
+        r = cell // cols
+        c = cell - r * cols
+        for k in range(4):
+            if k == 0:
+                if r == 0:
+                    continue
+                neighbor = cell - cols
+            elif k == 1:
+                if r == rows - 1:
+                    continue
+                neighbor = cell + cols
+            elif k == 2:
+                if c == 0:
+                    continue
+                neighbor = cell - 1
+            else:
+                if c == cols - 1:
+                    continue
+                neighbor = cell + 1
+            if closed[neighbor]:
+                continue
+            closed[neighbor] = True
+            elevation = elevations[neighbor]
+            if np.isnan(elevation):
+                levels[neighbor] = np.inf
+                heap_size = _heap_push(heap_keys, heap_cells, heap_size, np.inf, neighbor)
+            elif elevation <= level:
+                levels[neighbor] = level
+                pit_cells[pit_size] = neighbor
+                pit_size += 1
+            else:
+                levels[neighbor] = elevation
+                heap_size = _heap_push(heap_keys, heap_cells, heap_size, elevation, neighbor)
+
+    return levels.reshape((rows, cols))
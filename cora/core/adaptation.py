@@ -1,7 +1,9 @@
+import math
 import numpy as np
 from shapely.geometry import LineString
 from rasterio.transform import Affine
 import rasterio.features
+import rasterio.windows
 
 def rasterize_line(line: LineString, dem_shape: tuple, transform: Affine) -> np.ndarray:
     if not isinstance(line, LineString):
@@ -19,6 +21,61 @@ def rasterize_line(line: LineString, dem_shape: tuple, transform: Affine) -> np.
 
     return pixel_coords
 
+def apply_sea_walls(
+    dem: np.ndarray,
+    walls: list[tuple[LineString, float]],
+    transform: Affine
+) -> np.ndarray:
+    """
+    Raises the DEM to each wall's height along its line, modifying ``dem`` in place.
+
+    All walls are burned into one raster with a single rasterize call, and the DEM is
+    then updated with one in-place elementwise maximum. Where walls overlap, the taller
+    wall wins. Only the window around the walls is updated.
+
+    Args:
+        dem (np.ndarray): The 2D elevation array to modify.
+        walls (list[tuple[LineString, float]]): (wall line, wall height) pairs.
+        transform (Affine): The DEM's affine transform.
+
+    Returns:
+        np.ndarray: ``dem``, after the walls have been applied.
+    """
+    for line, _ in walls:
+        if not isinstance(line, LineString):
+            raise TypeError("Each wall line must be a shapely LineString.")
+    if not walls:
+        return dem
+
+    # The walls are rasterized over the full DEM grid, because GDAL rounds cells on a
+    # shifted window origin differently. To keep that cheap, the raster holds 1-based
+    # wall indices (one byte per cell for up to 255 walls) rather than heights, and the
+    # heights are only looked up in the window around the walls, padded by a cell.
+    bounds = np.array([line.bounds for line, _ in walls])
+    window = rasterio.windows.from_bounds(bounds[:, 0].min(), bounds[:, 1].min(),
+                                          bounds[:, 2].max(), bounds[:, 3].max(), transform)
+    row_start = max(0, math.floor(window.row_off) - 1)
+    col_start = max(0, math.floor(window.col_off) - 1)
+    row_stop = min(dem.shape[0], math.ceil(window.row_off + window.height) + 1)
+    col_stop = min(dem.shape[1], math.ceil(window.col_off + window.width) + 1)
+    if row_start >= row_stop or col_start >= col_stop:
+        return dem
+    rows, cols = slice(row_start, row_stop), slice(col_start, col_stop)
+
+    # rasterize writes shapes in order, so sort ascending to let the tallest wall win.
+    shapes = sorted(walls, key=lambda wall: wall[1])
+    height_dtype = np.float64 if dem.dtype == np.float64 else np.float32
+    heights = np.array([-np.inf] + [height for _, height in shapes], dtype=height_dtype)
+    wall_index = rasterio.features.rasterize(
+        shapes=[(line, index) for index, (line, _) in enumerate(shapes, start=1)],
+        out_shape=dem.shape,
+        transform=transform,
+        fill=0,
+        dtype=np.uint8 if len(shapes) < 256 else np.uint32
+    )
+    np.maximum(dem[rows, cols], heights[wall_index[rows, cols]], out=dem[rows, cols], casting='unsafe')
+    return dem
+
 def apply_sea_wall(
     dem: np.ndarray,
     wall_line: LineString,
@@ -26,14 +83,25 @@ def apply_sea_wall(
     transform: Affine
 ) -> np.ndarray:
     modified_dem = dem.copy()
+    return apply_sea_walls(modified_dem, [(wall_line, wall_height)], transform)
 
-    wall_pixels = rasterize_line(wall_line, dem.shape, transform)
-
-    if wall_pixels.size > 0:
-        rows, cols = wall_pixels[:, 0], wall_pixels[:, 1]
-
-        current_elevations = modified_dem[rows, cols]
-        new_elevations = np.maximum(current_elevations, wall_height)
-        modified_dem[rows, cols] = new_elevations
+if __name__ == '__main__':
+    print("Running manual check of apply_sea_walls against a full-raster height burn...")
+    from rasterio.transform import from_origin
 
-    return modified_dem
+    check_transform = from_origin(-80.3, 25.9, 0.001, 0.001)
+    check_dem = np.zeros((300, 400), dtype=np.float32)
+    check_walls = {
+        "vertical wall on a cell boundary": [(LineString([(-80.25, 25.85), (-80.25, 25.75)]), 3.0)],
+        "horizontal wall on a cell boundary": [(LineString([(-80.28, 25.85), (-80.2, 25.85)]), 3.0)],
+        "diagonal wall": [(LineString([(-80.2137, 25.8412), (-80.1, 25.79)]), 3.0)],
+        "overlapping walls": [(LineString([(-80.29, 25.8), (-80.0, 25.7)]), 2.0),
+                              (LineString([(-80.2, 25.89), (-80.2, 25.61)]), 4.5)],
+    }
+    for name, wall_list in check_walls.items():
+        expected = rasterio.features.rasterize(
+            shapes=sorted(wall_list, key=lambda wall: wall[1]), out_shape=check_dem.shape,
+            transform=check_transform, fill=-np.inf, dtype=np.float32)
+        np.maximum(expected, check_dem, out=expected)
+        result = apply_sea_walls(check_dem.copy(), wall_list, check_transform)
+        print(f"{name}: {'OK' if np.array_equal(result, expected) else 'MISMATCH'}")
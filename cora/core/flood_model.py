@@ -1,14 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import scipy.ndimage
-from cora.core.geospatial_utils import is_coastal_edge
+import scipy.sparse
+import scipy.sparse.csgraph
+from cora.core._flood_kernels import NUMBA_AVAILABLE, priority_flood_levels
 
-def bathtub_inundation(dem: np.ndarray, sea_level: float) -> np.ndarray:
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# numexpr only beats a single NumPy pass when it can split the work across threads,
+# and below this many cells its start-up costs more than it saves.
+NUMEXPR_MIN_CELLS = 1_000_000
+
+# Rows are thresholded into a byte mask this large before packing, so the mask is
+# still in L2 cache when it is counted and packed.
+PACK_BLOCK_BYTES = 256 * 1024
+
+def bathtub_inundation(dem: np.ndarray, sea_level: float, out: np.ndarray | None = None) -> np.ndarray:
     if not isinstance(dem, np.ndarray):
         raise TypeError("Input DEM must be a NumPy array.")
     if not isinstance(sea_level, (int, float)):
         raise TypeError("Sea level must be a numeric value.")
+    if out is None:
+        out = np.empty(dem.shape, dtype=bool)
+    elif out.shape != dem.shape or out.dtype != bool:
+        raise ValueError("out must be a boolean array with the same shape as the DEM.")
+
+    if numexpr is not None and numexpr.get_num_threads() > 1 and dem.size >= NUMEXPR_MIN_CELLS:
+        # Compare in the DEM's own float dtype, as NumPy does, so both paths agree exactly.
+        threshold = dem.dtype.type(sea_level) if np.issubdtype(dem.dtype, np.floating) else sea_level
+        return numexpr.evaluate('dem <= threshold', local_dict={'dem': dem, 'threshold': threshold}, out=out)
+    return np.less_equal(dem, sea_level, out=out)
+
+def bathtub_inundation_packed(dem: np.ndarray, sea_level: float, count: bool = True,
+                              out: np.ndarray | None = None) -> tuple[np.ndarray, int | None]:
+    """
+    Computes ``bathtub_inundation`` bit-packed along rows, with its flooded cell count.
+
+    The result has the layout of ``np.packbits(mask, axis=-1)``. The DEM is processed
+    in blocks of rows whose byte mask fits in ``PACK_BLOCK_BYTES``, so the full-size
+    byte mask is never written out to memory.
+
+    Args:
+        dem (np.ndarray): The 2D elevation array.
+        sea_level (float): The sea level threshold.
+        count (bool): Whether to count the flooded cells.
+        out (np.ndarray | None): Optional uint8 array to write the packed mask into.
+
+    Returns:
+        tuple[np.ndarray, int | None]: The packed uint8 flood mask and its flooded cell
+        count, or None when ``count`` is False.
+    """
+    if not isinstance(dem, np.ndarray):
+        raise TypeError("Input DEM must be a NumPy array.")
+    if dem.ndim != 2:
+        raise ValueError("Input DEM must be a 2D array.")
 
-    return np.where(dem <= sea_level, 1, 0)
+    height, width = dem.shape
+    packed_shape = (height, (width + 7) // 8)
+    if out is None:
+        out = np.empty(packed_shape, dtype=np.uint8)
+    elif out.shape != packed_shape or out.dtype != np.uint8:
+        raise ValueError("out must be a uint8 array of shape (rows, ceil(cols / 8)).")
+    block_rows = max(1, PACK_BLOCK_BYTES // max(1, width))
+    block_mask = np.empty((min(block_rows, height), width), dtype=bool)
+    flooded_cells = 0 if count else None
+    for row in range(0, height, block_rows):
+        rows = slice(row, min(row + block_rows, height))
+        mask = np.less_equal(dem[rows], sea_level, out=block_mask[:rows.stop - row])
+        if count:
+            flooded_cells += int(np.count_nonzero(mask))
+        out[rows] = np.packbits(mask, axis=-1)
+    return out, flooded_cells
 
 def binary_flood_fill(seed_points: np.ndarray, potential_flood_area: np.ndarray) -> np.ndarray:
     if not isinstance(seed_points, np.ndarray) or not isinstance(potential_flood_area, np.ndarray):
@@ -21,14 +86,16 @@ def binary_flood_fill(seed_points: np.ndarray, potential_flood_area: np.ndarray)
         if potential_flood_area.dtype != bool:
             potential_flood_area = potential_flood_area.astype(bool)
 
-    valid_seed_points = seed_points & potential_flood_area
-
-    filled_area = scipy.ndimage.binary_propagation(
-        input=valid_seed_points,
-        mask=potential_flood_area
-    )
+    labels, num_labels = scipy.ndimage.label(potential_flood_area)
+    filled_area = _components_containing(labels, num_labels, labels[seed_points])
     return filled_area
 
+def _components_containing(labels: np.ndarray, num_labels: int, seed_labels: np.ndarray) -> np.ndarray:
+    seeded = np.zeros(num_labels + 1, dtype=bool)
+    seeded[seed_labels] = True
+    seeded[0] = False
+    return seeded[labels]
+
 def connected_flood(dem: np.ndarray, sea_level: float) -> np.ndarray:
     if not isinstance(dem, np.ndarray):
         raise TypeError("Input DEM must be a NumPy array.")
@@ -37,15 +104,102 @@ def connected_flood(dem: np.ndarray, sea_level: float) -> np.ndarray:
     if not isinstance(sea_level, (int, float)):
         raise TypeError("Sea level must be a numeric value.")
 
-    potential_flood_area = (dem <= sea_level)
-    coastal_edges = is_coastal_edge(dem)
-
-    ocean_seed_points = potential_flood_area & coastal_edges
+    potential_flood_area = bathtub_inundation(dem, sea_level)
+    labels, num_labels = scipy.ndimage.label(potential_flood_area)
 
-    flood_mask = binary_flood_fill(ocean_seed_points, potential_flood_area)
+    # Ocean seeds are the potentially flooded cells on the DEM border, so only the
+    # perimeter labels are needed rather than a full-size coastal edge mask.
+    border_labels = np.concatenate((labels[0, :], labels[-1, :], labels[:, 0], labels[:, -1]))
+    flood_mask = _components_containing(labels, num_labels, border_labels)
 
     return flood_mask
 
+def connected_flood_tiled(dem: np.ndarray, sea_level: float, tile: tuple[int, int] = (1024, 1024),
+                          max_workers: int | None = None) -> np.ndarray:
+    """
+    Computes the same mask as ``connected_flood``, labelling tiles of the DEM in parallel.
+
+    Each tile is labelled on its own thread (SciPy releases the GIL while labelling),
+    and components that touch across tile seams are then merged with a single
+    connected-components pass over the seam pairs.
+
+    Args:
+        dem (np.ndarray): The 2D elevation array.
+        sea_level (float): The sea level threshold.
+        tile (tuple[int, int]): The tile size as (rows, cols).
+        max_workers (int | None): Number of labelling threads, as for ThreadPoolExecutor.
+
+    Returns:
+        np.ndarray: A boolean mask of cells flooded from the DEM edge.
+    """
+    if not isinstance(dem, np.ndarray):
+        raise TypeError("Input DEM must be a NumPy array.")
+    if dem.ndim != 2:
+        raise ValueError("Input DEM must be a 2D array.")
+    if not isinstance(sea_level, (int, float)):
+        raise TypeError("Sea level must be a numeric value.")
+
+    height, width = dem.shape
+    tile_rows, tile_cols = tile
+    if height <= tile_rows and width <= tile_cols:
+        return connected_flood(dem, sea_level)
+
+    potential_flood_area = bathtub_inundation(dem, sea_level)
+    tiles = [(slice(row, min(row + tile_rows, height)), slice(col, min(col + tile_cols, width)))
+             for row in range(0, height, tile_rows) for col in range(0, width, tile_cols)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tile_results = list(executor.map(lambda tile_slices: scipy.ndimage.label(potential_flood_area[tile_slices]),
+                                         tiles))
+
+    # Give every tile its own label range in one global label grid.
+    labels = np.zeros(dem.shape, dtype=np.int32)
+    num_labels = 0
+    for tile_slices, (tile_labels, tile_num_labels) in zip(tiles, tile_results):
+        np.add(tile_labels, num_labels, out=labels[tile_slices], where=tile_labels > 0)
+        num_labels += tile_num_labels
+
+    seam_pairs = [(labels[:, col - 1], labels[:, col]) for col in range(tile_cols, width, tile_cols)]
+    seam_pairs += [(labels[row - 1, :], labels[row, :]) for row in range(tile_rows, height, tile_rows)]
+    first = np.concatenate([a for a, _ in seam_pairs])
+    second = np.concatenate([b for _, b in seam_pairs])
+    touching = (first > 0) & (second > 0)
+    seams = scipy.sparse.coo_matrix((np.ones(np.count_nonzero(touching), dtype=np.int8),
+                                     (first[touching], second[touching])),
+                                    shape=(num_labels + 1, num_labels + 1))
+    _, components = scipy.sparse.csgraph.connected_components(seams, directed=False)
+
+    border_labels = np.concatenate((labels[0, :], labels[-1, :], labels[:, 0], labels[:, -1]))
+    ocean_components = np.zeros(components.max() + 1, dtype=bool)
+    ocean_components[components[border_labels[border_labels > 0]]] = True
+    flooded_labels = ocean_components[components]
+    flooded_labels[0] = False
+    return flooded_labels[labels]
+
+def priority_flood_from_edge(dem: np.ndarray) -> np.ndarray:
+    """
+    Computes the sea level at which each DEM cell first becomes connected to the coast.
+
+    The result is a priority-flood over the whole DEM, so a connected flood for any sea
+    level is then a single comparison: ``priority_flood_from_edge(dem) <= sea_level``
+    gives the same mask as ``connected_flood(dem, sea_level)``. Use it when many sea
+    levels are evaluated against the same DEM; for a single level ``connected_flood``
+    is cheaper. Installing numba is strongly recommended for large DEMs.
+
+    Args:
+        dem (np.ndarray): The 2D elevation array.
+
+    Returns:
+        np.ndarray: Flood levels with the DEM's shape (float32, or float64 for float64 DEMs).
+    """
+    if not isinstance(dem, np.ndarray):
+        raise TypeError("Input DEM must be a NumPy array.")
+    if dem.ndim != 2:
+        raise ValueError("Input DEM must be a 2D array.")
+
+    if dem.dtype != np.float64:
+        dem = dem.astype(np.float32, copy=False)
+    return priority_flood_levels(np.ascontiguousarray(dem))
+
 if __name__ == '__main__':
     print("Running manual test for bathtub_inundation...")
 
@@ -66,28 +220,28 @@ if __name__ == '__main__':
     print("Flood Mask:")
     print(flood_mask_1)
     print(f"Shape: {flood_mask_1.shape}, Data Type: {flood_mask_1.dtype}")
-    print(f"Number of flooded cells: {np.sum(flood_mask_1)}")
+    print(f"Number of flooded cells: {np.count_nonzero(flood_mask_1)}")
 
     sea_level_2 = 0.0
     flood_mask_2 = bathtub_inundation(sample_dem, sea_level_2)
     print(f"\nTest Case 2: Sea Level = {sea_level_2}")
     print("Flood Mask:")
     print(flood_mask_2)
-    print(f"Number of flooded cells: {np.sum(flood_mask_2)}")
+    print(f"Number of flooded cells: {np.count_nonzero(flood_mask_2)}")
 
     sea_level_3 = 10.0
     flood_mask_3 = bathtub_inundation(sample_dem, sea_level_3)
     print(f"\nTest Case 3: Sea Level = {sea_level_3}")
     print("Flood Mask:")
     print(flood_mask_3)
-    print(f"Number of flooded cells: {np.sum(flood_mask_3)}")
+    print(f"Number of flooded cells: {np.count_nonzero(flood_mask_3)}")
 
     sea_level_4 = -1.0
     flood_mask_4 = bathtub_inundation(sample_dem, sea_level_4)
     print(f"\nTest Case 4: Sea Level = {sea_level_4}")
     print("Flood Mask:")
     print(flood_mask_4)
-    print(f"Number of flooded cells: {np.sum(flood_mask_4)}")
+    print(f"Number of flooded cells: {np.count_nonzero(flood_mask_4)}")
 
     print("\nManual test finished.")
 
@@ -108,7 +262,7 @@ if __name__ == '__main__':
     connected_flood_mask = connected_flood(sample_dem_cf, sea_level_cf)
     print("\nConnected Flood Mask (expected: bottom row True, others False):")
     print(connected_flood_mask)
-    print(f"Number of connected flooded cells: {np.sum(connected_flood_mask)}")
+    print(f"Number of connected flooded cells: {np.count_nonzero(connected_flood_mask)}")
 
     sample_dem_internal = np.array([
         [10, 10, 10, 10, 10],
@@ -124,7 +278,7 @@ if __name__ == '__main__':
     connected_flood_mask_internal = connected_flood(sample_dem_internal, sea_level_internal)
     print("\nConnected Flood Mask (internal low area should NOT be flooded, parts of bottom edge should):")
     print(connected_flood_mask_internal)
-    print(f"Number of connected flooded cells: {np.sum(connected_flood_mask_internal)}")
+    print(f"Number of connected flooded cells: {np.count_nonzero(connected_flood_mask_internal)}")
 
     sample_dem_high_edges = np.array([
         [10, 10, 10],
@@ -138,6 +292,6 @@ if __name__ == '__main__':
     connected_flood_mask_high_edges = connected_flood(sample_dem_high_edges, sea_level_high_edges)
     print("\nConnected Flood Mask (should be all False as no edge seeds are <= sea_level):")
     print(connected_flood_mask_high_edges)
-    print(f"Number of connected flooded cells: {np.sum(connected_flood_mask_high_edges)}")
+    print(f"Number of connected flooded cells: {np.count_nonzero(connected_flood_mask_high_edges)}")
 
     print("\nManual test for connected_flood finished.")
\ No newline at end of file
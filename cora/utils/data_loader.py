@@ -1,29 +1,239 @@
+import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import rasterio
+from rasterio.enums import Resampling
 from rasterio.transform import Affine
 from rasterio.crs import CRS
+from rasterio.windows import Window
 
 
-def load_dem(tif_path: str) -> tuple[np.ndarray, Affine, CRS]:
+def load_dem(tif_path: str, dtype=np.float32) -> tuple[np.ndarray, Affine, CRS]:
     """
     Loads a Digital Elevation Model (DEM) from a GeoTIFF file.
 
+    The band is decoded straight into a C-contiguous float32 array, which halves
+    memory traffic for the flood model compared with float64 elevations.
+
     Args:
         tif_path (str): The file path to the GeoTIFF file.
+        dtype: The dtype the band is decoded into.
 
     Returns:
         tuple[np.ndarray, Affine, CRS]: A tuple containing:
-            - The DEM data as a NumPy array.
+            - The DEM data as a NumPy array (float32 by default).
             - The Affine transformation object.
             - The Coordinate Reference System (CRS) of the DEM.
     """
     with rasterio.open(tif_path) as src:
-        dem_array = src.read(1)
+        dem_array = np.ascontiguousarray(src.read(1, out_dtype=dtype))
         transform = src.transform
         crs = src.crs
     return dem_array, transform, crs
 
 
+def _map_raw_band(src) -> np.ndarray | None:
+    """
+    Maps band 1 of an uncompressed, striped, little-endian float32 GeoTIFF straight from
+    the file, or returns None if its strips are not stored as one contiguous block.
+    """
+    if (src.driver != 'GTiff' or src.count != 1 or src.compression is not None
+            or src.dtypes[0] != 'float32' or src.profile.get('tiled', False)):
+        return None
+    strip_rows = src.block_shapes[0][0]
+    strip_bytes = strip_rows * src.width * np.dtype(np.float32).itemsize
+    offsets = [src.get_tag_item(f'BLOCK_OFFSET_0_{strip}', 'TIFF', bidx=1)
+               for strip in range(math.ceil(src.height / strip_rows))]
+    if None in offsets:
+        return None
+    offsets = np.array(offsets, dtype=np.int64)
+    if np.any(np.diff(offsets) != strip_bytes):
+        return None
+    with open(src.name, 'rb') as tif_file:
+        if tif_file.read(2) != b'II':
+            return None
+    return np.memmap(src.name, dtype='<f4', mode='r', offset=int(offsets[0]), shape=src.shape)
+
+
+def load_dem_memmap(tif_path: str) -> tuple[np.ndarray, Affine, CRS]:
+    """
+    Loads a DEM as a read-only float32 memory map, decoding the GeoTIFF only once.
+
+    An uncompressed float32 GeoTIFF with contiguous strips is mapped directly. Otherwise
+    the decoded band is kept in a ``<tif_path>.f32.bin`` sidecar next to the GeoTIFF,
+    and is reused as long as it is newer than the GeoTIFF, so re-opening a DEM skips
+    decompression and the OS page cache handles residency. If the sidecar cannot be
+    written, the DEM is loaded into memory as with ``load_dem``.
+
+    Args:
+        tif_path (str): The file path to the GeoTIFF file.
+
+    Returns:
+        tuple[np.ndarray, Affine, CRS]: A tuple containing:
+            - The DEM data as a read-only float32 ``np.memmap`` (or array).
+            - The Affine transformation object.
+            - The Coordinate Reference System (CRS) of the DEM.
+    """
+    sidecar_path = f"{tif_path}.f32.bin"
+    with rasterio.open(tif_path) as src:
+        shape = src.shape
+        transform = src.transform
+        crs = src.crs
+        dem_array = _map_raw_band(src)
+        if dem_array is not None:
+            return dem_array, transform, crs
+        expected_size = shape[0] * shape[1] * np.dtype(np.float32).itemsize
+        sidecar_fresh = (os.path.exists(sidecar_path)
+                         and os.path.getmtime(sidecar_path) >= os.path.getmtime(tif_path)
+                         and os.path.getsize(sidecar_path) == expected_size)
+        if not sidecar_fresh:
+            dem_array = np.ascontiguousarray(src.read(1, out_dtype=np.float32))
+            temp_path = f"{sidecar_path}.tmp"
+            try:
+                dem_array.tofile(temp_path)
+                os.replace(temp_path, sidecar_path)
+            except OSError as e:
+                print(f"Could not write DEM cache '{sidecar_path}': {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return dem_array, transform, crs
+
+    dem_array = np.memmap(sidecar_path, dtype=np.float32, mode='r', shape=shape)
+    return dem_array, transform, crs
+
+
+def load_dem_overview(tif_path: str, max_size: int) -> tuple[np.ndarray, Affine, CRS]:
+    """
+    Loads a block-averaged, reduced-resolution copy of a DEM for display.
+
+    The read is decimated by an integer factor so the longer side is at most
+    ``max_size`` cells; GDAL serves it from the file's overviews when it has any.
+
+    Args:
+        tif_path (str): The file path to the GeoTIFF file.
+        max_size (int): The largest allowed width or height of the result.
+
+    Returns:
+        tuple[np.ndarray, Affine, CRS]: The float32 overview, its Affine transformation
+        and the CRS of the DEM.
+    """
+    with rasterio.open(tif_path) as src:
+        factor = max(1, math.ceil(max(src.height, src.width) / max(1, max_size)))
+        out_height = max(1, src.height // factor)
+        out_width = max(1, src.width // factor)
+        overview = src.read(1, out_shape=(out_height, out_width),
+                            resampling=Resampling.average, out_dtype=np.float32)
+        transform = src.transform * Affine.scale(src.width / out_width, src.height / out_height)
+        crs = src.crs
+    return overview, transform, crs
+
+
+def generate_windows(shape: tuple[int, int], tile: tuple[int, int] = (1024, 1024),
+                     halo: int = 0):
+    """
+    Splits a raster of the given shape into tiles, each padded by a halo.
+
+    Args:
+        shape (tuple[int, int]): The raster shape as (height, width).
+        tile (tuple[int, int]): The tile size as (rows, cols).
+        halo (int): Number of extra cells read on every side of a tile, clipped to the raster.
+
+    Yields:
+        tuple[Window, Window]: The padded window to read and the un-padded core window
+        that the tile is responsible for. Core windows cover the raster exactly once.
+    """
+    height, width = shape
+    tile_rows, tile_cols = tile
+    for row_off in range(0, height, tile_rows):
+        for col_off in range(0, width, tile_cols):
+            core_height = min(tile_rows, height - row_off)
+            core_width = min(tile_cols, width - col_off)
+            core_window = Window(col_off, row_off, core_width, core_height)
+
+            top = max(0, row_off - halo)
+            left = max(0, col_off - halo)
+            bottom = min(height, row_off + core_height + halo)
+            right = min(width, col_off + core_width + halo)
+            read_window = Window(left, top, right - left, bottom - top)
+            yield read_window, core_window
+
+
+def load_dem_tiles(tif_path: str, tile: tuple[int, int] = (1024, 1024), halo: int = 16,
+                   max_workers: int = 1, dtype=np.float32, max_inflight_bytes: int = 256 * 2**20):
+    """
+    Reads a DEM tile by tile, so only one tile (plus its halo) is resident at a time.
+
+    With ``max_workers`` above 1, upcoming tiles are read and decoded ahead on a thread
+    pool (GDAL releases the GIL while reading), each thread with its own dataset handle.
+    Read-ahead is bounded to ``2 * max_workers`` tiles and to about ``max_inflight_bytes``
+    of tile data, so wide tiles reduce the number of reader threads (down to a plain
+    serial read) rather than multiplying memory. Tiles are still yielded in order.
+
+    Args:
+        tif_path (str): The file path to the GeoTIFF file.
+        tile (tuple[int, int]): The tile size as (rows, cols).
+        halo (int): Number of overlapping cells read around each tile.
+        max_workers (int): Number of reader threads.
+        dtype: The dtype each tile is decoded into.
+        max_inflight_bytes (int): Upper bound on the tile data read ahead.
+
+    Yields:
+        tuple[np.ndarray, Affine, Window, tuple[slice, slice]]: For each tile:
+            - The DEM data of the padded tile (float32 by default).
+            - The Affine transformation of the padded tile.
+            - The core window of the tile in the full raster.
+            - The slices selecting the core window out of the padded tile.
+    """
+    with rasterio.open(tif_path) as src:
+        windows = generate_windows(src.shape, tile, halo)
+        tile_bytes = (min(src.height, tile[0] + 2 * halo) * min(src.width, tile[1] + 2 * halo)
+                      * np.dtype(dtype).itemsize)
+        max_inflight = max(1, min(2 * max_workers, max_inflight_bytes // max(1, tile_bytes)))
+        max_workers = min(max_workers, max_inflight)
+        if max_workers <= 1:
+            for read_window, core_window in windows:
+                yield _read_tile(src, read_window, core_window, dtype)
+            return
+
+        local = threading.local()
+        thread_datasets = []
+
+        def read_in_thread(read_window, core_window):
+            if not hasattr(local, 'src'):
+                local.src = rasterio.open(tif_path)
+                thread_datasets.append(local.src)
+            return _read_tile(local.src, read_window, core_window, dtype)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pending = deque()
+                try:
+                    for read_window, core_window in windows:
+                        pending.append(executor.submit(read_in_thread, read_window, core_window))
+                        if len(pending) >= max_inflight:
+                            yield pending.popleft().result()
+                    while pending:
+                        yield pending.popleft().result()
+                finally:
+                    for future in pending:
+                        future.cancel()
+        finally:
+            for thread_src in thread_datasets:
+                thread_src.close()
+
+
+def _read_tile(src, read_window: Window, core_window: Window, dtype):
+    dem_tile = src.read(1, window=read_window, out_dtype=dtype)
+    row_start = core_window.row_off - read_window.row_off
+    col_start = core_window.col_off - read_window.col_off
+    core_slices = (slice(row_start, row_start + core_window.height),
+                   slice(col_start, col_start + core_window.width))
+    return dem_tile, src.window_transform(read_window), core_window, core_slices
+
+
 if __name__ == '__main__':
     sample_file_path = None
 
@@ -1,51 +1,83 @@
 import os
+import shutil
 import osmnx as ox
 import logging
 import geopandas as gpd
 import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 ox.settings.log_console = True
 ox.settings.use_cache = True
 ox.settings.timeout = 180
 logging.basicConfig(level=logging.INFO)
 
-def _get_osm_cache_path(north, south, east, west, tags, cache_dir="cache"):
+OSM_CACHE_DIR = "cache"
+
+def _get_osm_cache_path(north, south, east, west, tags, cache_dir=OSM_CACHE_DIR):
     os.makedirs(cache_dir, exist_ok=True)
     tags_str = json.dumps(tags, sort_keys=True)
+    # Round so that bboxes computed from the same inputs hit the same entry despite float noise.
+    north, south, east, west = (round(coord, 6) for coord in (north, south, east, west))
     key_str = f"{north}_{south}_{east}_{west}_{tags_str}"
-    hash_digest = hashlib.sha256(key_str.encode()).hexdigest()[:16]
-    filename = f"osm_{hash_digest}.geojson"
+    hash_digest = hashlib.blake2b(key_str.encode(), digest_size=8).hexdigest()
+    filename = f"osm_{hash_digest}.parquet"
     return os.path.join(cache_dir, filename)
 
 def fetch_osm_geometries(north, south, east, west, tags):
     cache_path = _get_osm_cache_path(north, south, east, west, tags)
     if os.path.exists(cache_path):
         logging.info(f"Loading OSM data from cache: {cache_path}")
-        gdf = gpd.read_file(cache_path)
+        gdf = gpd.read_parquet(cache_path)
         return gdf
 
     bbox = west, south, east, north
     logging.info(f"Fetching OSM data for bbox={bbox} and tags={tags}")
     gdf = ox.features.features_from_bbox(bbox, tags)
     if not gdf.empty:
-        gdf.to_file(cache_path, driver="GeoJSON")
+        gdf.to_parquet(cache_path, compression="snappy")
         logging.info(f"Saved OSM data to cache: {cache_path}")
     return gdf
 
+def clear_osm_cache(cache_dir=OSM_CACHE_DIR):
+    """
+    Removes the cached OSM query results and osmnx's own HTTP response cache.
+
+    Returns the list of cache folders that were cleared.
+    """
+    cleared = []
+    for folder in dict.fromkeys(os.path.normpath(f) for f in (cache_dir, ox.settings.cache_folder)):
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+            cleared.append(folder)
+        os.makedirs(folder, exist_ok=True)
+    return cleared
+
+def fetch_osm_geometries_many(bboxes, tags, max_workers=4):
+    """
+    Fetches OSM geometries for several bounding boxes concurrently.
+
+    Each bbox is a (north, south, east, west) tuple. Requests are network-bound,
+    so they run on a thread pool; every bbox still goes through the on-disk cache.
+    Results are returned in the same order as ``bboxes``.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(fetch_osm_geometries, north, south, east, west, tags)
+            for north, south, east, west in bboxes
+        ]
+        return [future.result() for future in futures]
+
 def mark_critical_infrastructure(buildings_gdf):
     if buildings_gdf is None or buildings_gdf.empty:
         return buildings_gdf
 
-    critical_amenities = {"hospital", "school", "fire_station", "police", "emergency"}
-    def is_critical(row):
-        amenity = row.get("amenity", None)
-        return amenity in critical_amenities
+    critical_amenities = ["hospital", "school", "fire_station", "police", "emergency"]
 
     if "amenity" not in buildings_gdf.columns:
         buildings_gdf["amenity"] = None
 
-    buildings_gdf["is_critical"] = buildings_gdf.apply(is_critical, axis=1)
+    buildings_gdf["is_critical"] = buildings_gdf["amenity"].isin(critical_amenities)
     return buildings_gdf
 
 if __name__ == "__main__":
@@ -1,9 +1,19 @@
+import struct
+import zlib
 import numpy as np
-import matplotlib.pyplot as plt
+from PIL import Image
 import os
 
 
-def export_flood_map_png(flood_mask: np.ndarray, output_filepath: str):
+def export_flood_map_png(flood_mask: np.ndarray, output_filepath: str, decorated: bool = False,
+                         packed_width: int | None = None):
+    """
+    Saves a flood mask as a PNG image.
+
+    ``flood_mask`` may be given bit-packed along rows, as produced by
+    ``np.packbits(mask, axis=-1)``, in which case ``packed_width`` is the number of
+    columns of the unpacked mask.
+    """
     if not isinstance(flood_mask, np.ndarray):
         raise TypeError("Input flood_mask must be a NumPy array.")
     if not isinstance(output_filepath, str):
@@ -15,17 +25,167 @@ def export_flood_map_png(flood_mask: np.ndarray, output_filepath: str):
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    plt.figure()
-    plt.imshow(flood_mask, cmap='Blues')
-    plt.title("Flood Inundation Map")
-    plt.xlabel("X-coordinate")
-    plt.ylabel("Y-coordinate")
-    plt.colorbar(label="Flood Status (1=Flooded, 0=Dry)")
-    plt.savefig(output_filepath)
-    plt.close()
+    if decorated:
+        import matplotlib.pyplot as plt
+
+        if packed_width is not None:
+            flood_mask = np.unpackbits(_packed_rows(flood_mask, packed_width), axis=-1, count=packed_width)
+        plt.figure()
+        plt.imshow(flood_mask, cmap='Blues')
+        plt.title("Flood Inundation Map")
+        plt.xlabel("X-coordinate")
+        plt.ylabel("Y-coordinate")
+        plt.colorbar(label="Flood Status (1=Flooded, 0=Dry)")
+        plt.savefig(output_filepath)
+        plt.close()
+    else:
+        # Encode the mask itself (flooded=white, dry=black) as a 1-bit PNG. Pillow's 1-bit
+        # raw layout is the same MSB-first, byte-padded rows as np.packbits.
+        if packed_width is not None:
+            packed_rows = _packed_rows(flood_mask, packed_width)
+        else:
+            packed_width = flood_mask.shape[1]
+            packed_rows = np.packbits(flood_mask.astype(bool, copy=False), axis=-1)
+        image = Image.frombytes('1', (packed_width, packed_rows.shape[0]), packed_rows.tobytes())
+        image.save(output_filepath)
+    print(f"Flood map saved to: {output_filepath}")
+
+
+def export_flood_map_cog(flood_mask: np.ndarray, output_filepath: str, transform, crs,
+                         packed_width: int | None = None, block_size: int = 512):
+    """
+    Saves a flood mask as a deflate-compressed Cloud Optimized GeoTIFF (1=Flooded, 0=Dry).
+
+    The COG is tiled and carries overviews, so viewers can load large maps incrementally
+    instead of decoding one huge PNG. ``flood_mask`` may be bit-packed as for
+    ``export_flood_map_png``; it is unpacked one block of rows at a time.
+    """
+    import rasterio
+    import rasterio.shutil
+    from rasterio.io import MemoryFile
+    from rasterio.windows import Window
+
+    if not isinstance(flood_mask, np.ndarray):
+        raise TypeError("Input flood_mask must be a NumPy array.")
+    if not isinstance(output_filepath, str):
+        raise TypeError("Output filepath must be a string.")
+    if not output_filepath.lower().endswith((".tif", ".tiff")):
+        raise ValueError("Output filepath must end with .tif or .tiff")
+
+    output_dir = os.path.dirname(output_filepath)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    if packed_width is not None:
+        flood_mask = _packed_rows(flood_mask, packed_width)
+        height, width = flood_mask.shape[0], packed_width
+    else:
+        height, width = flood_mask.shape
+
+    profile = dict(driver='GTiff', height=height, width=width, count=1, dtype='uint8',
+                   transform=transform, crs=crs, tiled=True, blockxsize=block_size,
+                   blockysize=block_size, compress='deflate')
+    with MemoryFile() as memfile:
+        with memfile.open(**profile) as dst:
+            for row in range(0, height, block_size):
+                rows = flood_mask[row:row + block_size]
+                if packed_width is not None:
+                    rows = np.unpackbits(rows, axis=-1, count=packed_width)
+                dst.write(rows.astype(np.uint8, copy=False), 1,
+                          window=Window(0, row, width, rows.shape[0]))
+        rasterio.shutil.copy(memfile.name, output_filepath, driver='COG', compress='DEFLATE',
+                             blocksize=block_size, overview_resampling='mode',
+                             num_threads='ALL_CPUS')
     print(f"Flood map saved to: {output_filepath}")
 
 
+class FloodMapPngWriter:
+    """
+    Streams a bit-packed flood mask into a 1-bit PNG, one block of rows at a time.
+
+    Produces the same image as ``export_flood_map_png`` (flooded=white, dry=black), but
+    rows are compressed as they are written, so the full mask never has to be held.
+    Use it as a context manager and pass blocks of ``np.packbits(mask, axis=-1)`` rows,
+    top to bottom, to ``write``. The PNG is written to a ``.tmp`` file that only replaces
+    ``output_filepath`` once every row is written, so a failed run leaves no partial map.
+    """
+
+    def __init__(self, output_filepath: str, width: int, height: int, compress_level: int = 6):
+        if not isinstance(output_filepath, str):
+            raise TypeError("Output filepath must be a string.")
+        if not output_filepath.lower().endswith(".png"):
+            raise ValueError("Output filepath must end with .png")
+        output_dir = os.path.dirname(output_filepath)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        self.output_filepath = output_filepath
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(compress_level)
+        self._temp_filepath = f"{output_filepath}.tmp"
+        self._file = open(self._temp_filepath, 'wb')
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        # Greyscale, bit depth 1, no interlacing.
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0))
+
+    def write(self, packed_rows: np.ndarray):
+        packed_rows = _packed_rows(packed_rows, self.width)
+        if self.rows_written + packed_rows.shape[0] > self.height:
+            raise ValueError("More rows written than the PNG height.")
+        # Every PNG scanline starts with its filter type; 0 leaves the row unfiltered.
+        scanlines = np.zeros((packed_rows.shape[0], packed_rows.shape[1] + 1), dtype=np.uint8)
+        scanlines[:, 1:] = packed_rows
+        compressed = self._compressor.compress(scanlines.tobytes())
+        if compressed:
+            self._write_chunk(b'IDAT', compressed)
+        self.rows_written += packed_rows.shape[0]
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Only {self.rows_written} of {self.height} PNG rows were written.")
+            self._write_chunk(b'IDAT', self._compressor.flush())
+            self._write_chunk(b'IEND', b'')
+            self._file.close()
+            os.replace(self._temp_filepath, self.output_filepath)
+        except BaseException:
+            self.discard()
+            raise
+        print(f"Flood map saved to: {self.output_filepath}")
+
+    def discard(self):
+        """Closes the writer without producing an output file."""
+        self._file.close()
+        if os.path.exists(self._temp_filepath):
+            os.remove(self._temp_filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+def _packed_rows(flood_mask: np.ndarray, width: int) -> np.ndarray:
+    packed_rows = np.ascontiguousarray(flood_mask, dtype=np.uint8)
+    if packed_rows.ndim != 2 or packed_rows.shape[1] != (width + 7) // 8:
+        raise ValueError("A packed flood_mask must have ceil(packed_width / 8) bytes per row.")
+    return packed_rows
+
+
 if __name__ == '__main__':
     print("Running manual test for export_flood_map_png...")
 
@@ -1,27 +1,129 @@
+import logging
 import os
 import sys
-import shutil
-import osmnx as ox
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QLineEdit, QDockWidget, QSlider, QMessageBox,
     QFileDialog
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal
 import pyproj
 import rasterio
+import rasterio.warp
+import matplotlib
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.colors import Normalize
 from matplotlib.figure import Figure
 import numpy as np
-from shapely.geometry import LineString
+from shapely.geometry import LineString, box
 
-from cora.utils.data_loader import load_dem
-from cora.core.flood_model import connected_flood
-from cora.utils.osm_handler import fetch_osm_geometries, mark_critical_infrastructure
-from cora.analysis.impact_assessment import raster_to_vector_polygons, find_intersecting_features
+from cora.utils.data_loader import load_dem_memmap, load_dem_overview
+from cora.core.flood_model import NUMBA_AVAILABLE, connected_flood, connected_flood_tiled, priority_flood_from_edge
+from cora.utils.osm_handler import clear_osm_cache, fetch_osm_geometries, mark_critical_infrastructure
+from cora.analysis.impact_assessment import raster_to_vector_polygons, find_intersecting_features, find_intersecting_indices
 from cora.core.adaptation import apply_sea_wall
 
+# Per-analysis diagnostics are debug-level, since slider previews run many analyses.
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+FLOOD_POLYGON_CACHE_SIZE = 32
+# DEMs larger than this are labelled tile by tile on several threads.
+TILED_FLOOD_MIN_BYTES = 256 * 1024 * 1024
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+
+# Workers run on Python threads rather than a QThreadPool: pyproj keeps per-thread PROJ
+# state that does not survive between QRunnable runs, and a second CRS built on the same
+# pool thread crashes the process.
+_WORKER_POOL = ThreadPoolExecutor()
+
+
+class Worker:
+    """Runs fn(*args, **kwargs) on a worker thread and reports back through signals."""
+
+    def __init__(self, fn, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def start(self):
+        _WORKER_POOL.submit(self.run)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+def _apply_wall(dem, transform, sea_wall):
+    if sea_wall is None:
+        return dem
+    wall_geometry, wall_height = sea_wall
+    dem = apply_sea_wall(dem, wall_geometry, wall_height, transform)
+    print(f"Applied sea wall at height {wall_height}m.")
+    return dem
+
+
+def _compute_flood(dem, transform, slr_value_meters, sea_wall=None):
+    dem = _apply_wall(dem, transform, sea_wall)
+    if dem.nbytes > TILED_FLOOD_MIN_BYTES:
+        return connected_flood_tiled(dem, slr_value_meters)
+    return connected_flood(dem, slr_value_meters)
+
+
+def _compute_flood_levels(dem, transform, sea_wall=None):
+    return priority_flood_from_edge(_apply_wall(dem, transform, sea_wall))
+
+
+def _fetch_buildings(north, south, east, west):
+    buildings_gdf = fetch_osm_geometries(north, south, east, west, {"building": True})
+    return mark_critical_infrastructure(buildings_gdf)
+
+
+def _block_any(mask, window):
+    """Downsamples mask[window] by its step, keeping a block flooded if any of its cells is."""
+    rows, cols = window
+    step = rows.step
+    cells = mask[rows.start:rows.stop, cols.start:cols.stop]
+    if step == 1:
+        return cells
+    blocks = cells[0::step].copy()
+    for offset in range(1, step):
+        part = cells[offset::step]
+        blocks[:len(part)] |= part
+    out = blocks[:, 0::step].copy()
+    for offset in range(1, step):
+        part = blocks[:, offset::step]
+        out[:, :part.shape[1]] |= part
+    return out
+
+
+def _warm_up_flood_model():
+    # Loads (or compiles) the numba kernels for the float32 DEMs the GUI uses, so the
+    # first analysis does not pay for it.
+    dem = np.zeros((16, 16), dtype=np.float32)
+    connected_flood(dem, 0.5)
+    if NUMBA_AVAILABLE:
+        priority_flood_from_edge(dem)
+
+
 class MplCanvas(FigureCanvasQTAgg):
+    # Colours of dry and flooded cells, so boolean masks are drawn without a norm or colormap pass.
+    FLOOD_LUT = matplotlib.colormaps['Blues']([0.0, 1.0], bytes=True)
+
+    # Emitted when the axes grow or shrink enough that the raster background should be resampled.
+    raster_resized = pyqtSignal()
+
     def __init__(self, parent=None, width=5, height=4, dpi=100):
         self.fig = Figure(figsize=(width, height), dpi=dpi)
         self.axes = self.fig.subplots()
@@ -33,6 +135,108 @@ class MplCanvas(FigureCanvasQTAgg):
         self.axes.set_ylabel("Y-coordinate")
         self.fig.tight_layout()
 
+        # Frequently updated artists (flood mask, analysis overlays) are animated: a full
+        # draw renders everything else once and caches it, then updates only re-blit them.
+        self._background = None
+        self._animated_artists = []
+        self._flood_image = None
+        self._flood_rgba = None
+        self._raster_image = None
+        self._raster_size = None
+        self.mpl_connect('draw_event', self._on_draw)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # Layout is only re-measured when the canvas size changes, not on every update.
+        self.fig.tight_layout()
+        if self._raster_image is None or self._raster_size is None:
+            return
+        size = self.axes_pixel_size()
+        if size >= 2 * self._raster_size or 2 * size <= self._raster_size:
+            self.raster_resized.emit()
+
+    def axes_pixel_size(self):
+        bbox = self.axes.get_window_extent()
+        return max(1, int(max(bbox.width, bbox.height)))
+
+    def _on_draw(self, event):
+        self._background = self.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        # Artists removed by axes.clear() lose their axes; forget them.
+        self._animated_artists = [a for a in self._animated_artists if a.axes is not None]
+        for artist in sorted(self._animated_artists, key=lambda a: a.get_zorder()):
+            self.fig.draw_artist(artist)
+
+    def _blit(self):
+        if self._background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self._background)
+        self._draw_animated()
+        self.blit(self.fig.bbox)
+
+    def update_flood_mask(self, flood_mask_array: np.ndarray, extent=None):
+        if flood_mask_array.dtype == bool:
+            # Reuse one RGBA buffer for as long as the displayed window keeps its shape.
+            shape = flood_mask_array.shape + (4,)
+            if self._flood_rgba is None or self._flood_rgba.shape != shape:
+                self._flood_rgba = np.empty(shape, dtype=np.uint8)
+            np.take(self.FLOOD_LUT, flood_mask_array.view(np.uint8), axis=0, out=self._flood_rgba)
+            flood_mask_array = self._flood_rgba
+        if self._flood_image is None or self._flood_image.axes is None:
+            self._flood_image = self.axes.imshow(flood_mask_array, cmap='Blues', origin='upper',
+                                                 extent=extent, animated=True)
+            self._animated_artists.append(self._flood_image)
+            self.axes.set_title("Flood Inundation Map")
+            self.draw_idle()
+            return
+
+        self._flood_image.set_data(flood_mask_array)
+        self._flood_image.set_clim(0, 1)
+        if extent is not None and tuple(extent) != tuple(self._flood_image.get_extent()):
+            # A new extent moves the axes limits, so the cached background is stale.
+            self._flood_image.set_extent(extent)
+            self.draw_idle()
+            return
+        self._blit()
+
+    def add_animated(self, artists):
+        for artist in artists:
+            artist.set_animated(True)
+        self._animated_artists.extend(artists)
+        self._blit()
+
+    def remove_artists(self, artists):
+        for artist in artists:
+            if artist.axes is not None:
+                artist.remove()
+            if artist in self._animated_artists:
+                self._animated_artists.remove(artist)
+        self._blit()
+
+    def clear_overlays(self):
+        # Like axes.clear(), but keeps the raster background, limits, ticks and labels, so
+        # replacing the vector layers does not re-render the background from scratch.
+        for artist in [*self.axes.images, *self.axes.lines, *self.axes.collections,
+                       *self.axes.patches, *self.axes.texts]:
+            if artist is not self._raster_image:
+                artist.remove()
+        self._animated_artists = []
+        self._flood_image = None
+
+    def set_raster_background(self, raster: np.ndarray, extent, norm: Normalize, cmap='gray'):
+        # Colormap once to RGBA bytes, so draws only resample a screen-sized image.
+        rgba = matplotlib.colormaps[cmap](norm(raster), bytes=True)
+        if self._raster_image is None or self._raster_image.axes is None:
+            self._raster_image = self.axes.imshow(rgba, origin='upper', extent=extent)
+        else:
+            self._raster_image.set_data(rgba)
+            self._raster_image.set_extent(extent)
+        self._raster_size = self.axes_pixel_size()
+        return self._raster_image
+
     def plot_flood_mask(self, flood_mask_array: np.ndarray, extent=None):
         if not isinstance(flood_mask_array, np.ndarray):
             print("Warning: plot_flood_mask expects a NumPy array.")
@@ -51,17 +255,24 @@ class MplCanvas(FigureCanvasQTAgg):
                            transform=self.axes.transAxes)
             self.axes.set_title("Map Canvas - No Data")
         else:
-            im = self.axes.imshow(flood_mask_array, cmap='Blues', origin='upper', extent=extent)
+            if flood_mask_array.dtype == bool:
+                flood_mask_array = self.FLOOD_LUT[flood_mask_array.view(np.uint8)]
+            self.axes.imshow(flood_mask_array, cmap='Blues', origin='upper', extent=extent)
             self.axes.set_title("Flood Inundation Map")
             self.axes.set_xlabel("Longitude")
             self.axes.set_ylabel("Latitude")
 
-        self.fig.tight_layout()
         self.draw()
 
-    def plot_geodataframe(self, gdf, **plot_kwargs):
+    def plot_geodataframe(self, gdf, animated=False, **plot_kwargs):
+        existing = set(self.axes.get_children())
         gdf.plot(ax=self.axes, **plot_kwargs)
-        self.draw()
+        added = [a for a in self.axes.get_children() if a not in existing]
+        if animated:
+            self.add_animated(added)
+        else:
+            self.draw()
+        return added
 
 
 class CoraGUI(QMainWindow):
@@ -73,7 +284,9 @@ class CoraGUI(QMainWindow):
         self.dem_array: np.ndarray | None = None
         self.dem_transform = None
         self.dem_crs = None
+        self.wgs84_extent = None
         self.current_dem_path: str | None = None
+        self._dem_dialog_dir: str | None = None
         self.buildings_gdf = None
         self.roads_gdf = None
 
@@ -82,6 +295,34 @@ class CoraGUI(QMainWindow):
         self.sea_wall_geometry = None
         self.sea_wall_plot = None
 
+        self._dem_worker = None
+        self._buildings_worker = None
+        self._roads_worker = None
+        self._dem_display = None
+        self._dem_display_extent = None
+        self._dem_image = None
+        self._dem_norm = None
+        self._flood_mask = None
+        self._refining_dem_view = False
+
+        self._flood_worker = None
+        self._flood_worker_shows_status = False
+        self._analysis_pending = None
+        self._analysis_overlays = []
+        self._analysis_overlays_source = None
+        self._flood_levels = None
+        self._flood_levels_key = None
+        self._dem_version = 0
+        self._to_wgs84 = None
+        self._to_wgs84_crs = None
+        self._projected_layers = {}
+        self._layer_artists = {}
+        self._roads_utm = None
+        self._analysis_layers = {}
+        self._hospital_total = None
+        self._flood_polygons_cache = OrderedDict()
+        self._flood_impacts_cache = OrderedDict()
+
         self.initUI()
 
     def initUI(self):
@@ -92,9 +333,8 @@ class CoraGUI(QMainWindow):
         self.setCentralWidget(self.map_canvas)
 
         self.map_canvas.mpl_connect('button_press_event', self._on_map_click)
+        self.map_canvas.raster_resized.connect(self._refine_dem_view)
 
-        initial_map_data = np.zeros((10, 10))
-        self.map_canvas.plot_flood_mask(initial_map_data)
 
         self.controls_dock = QDockWidget("Controls", self)
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.controls_dock)
@@ -180,7 +420,14 @@ class CoraGUI(QMainWindow):
         slr_layout.addWidget(self.slr_value_label)
         dock_layout.addLayout(slr_layout)
 
+        # Coalesce bursts of valueChanged during a drag into one preview analysis.
+        self._slr_timer = QTimer(self)
+        self._slr_timer.setSingleShot(True)
+        self._slr_timer.setInterval(50)
+        self._slr_timer.timeout.connect(self._run_slr_preview)
+
         self.slr_slider.valueChanged.connect(self._on_slr_slider_changed)
+        self.slr_slider.sliderReleased.connect(self._on_slr_slider_released)
         self._on_slr_slider_changed(self.slr_slider.value())
 
         dock_layout.addStretch(1)
@@ -188,17 +435,11 @@ class CoraGUI(QMainWindow):
 
     def _clear_osm_cache(self):
         try:
-            if hasattr(ox, 'utils') and hasattr(ox.utils, 'clear_cache'):
-                ox.utils.clear_cache()
-                QMessageBox.information(self, "Cache Cleared", "OSM cache has been successfully cleared.")
+            cleared = clear_osm_cache()
+            if cleared:
+                QMessageBox.information(self, "Cache Cleared", f"OSM cache folder(s) {', '.join(cleared)} successfully cleared.")
             else:
-                cache_folder = 'cache'
-                if os.path.exists(cache_folder):
-                    shutil.rmtree(cache_folder)
-                    os.makedirs(cache_folder)
-                    QMessageBox.information(self, "Cache Cleared", f"OSM cache folder '{cache_folder}' has been successfully cleared.")
-                else:
-                    QMessageBox.warning(self, "Cache Clear Error", f"An error occurred while clearing the cache: {e}")
+                QMessageBox.information(self, "Cache Cleared", "The OSM cache was already empty.")
         except Exception as e:
             QMessageBox.critical(self, "Cache Clear Error", f"An error occurred while clearing the cache: {e}")
 
@@ -223,46 +464,133 @@ class CoraGUI(QMainWindow):
         else:
             return
 
-        tags = {"building": True}
-        self.statusBar().showMessage("Fetching OSM building data...", 5000)
+        self.statusBar().showMessage("Fetching OSM building data...")
+        print(f"Fetching OSM building data for bbox: N={north}, S={south}, E={east}, W={west}")
+        worker = Worker(_fetch_buildings, north, south, east, west)
+        worker.signals.finished.connect(self._on_buildings_ready)
+        worker.signals.error.connect(self._on_buildings_error)
+        self._buildings_worker = worker
+        self.load_osm_button.setEnabled(False)
+        worker.start()
+
+    def _on_buildings_ready(self, buildings_gdf):
+        self._buildings_worker = None
+        self.load_osm_button.setEnabled(True)
+        self.statusBar().clearMessage()
         try:
-            print(f"Fetching OSM building data for bbox: N={north}, S={south}, E={east}, W={west}")
-            self.buildings_gdf = fetch_osm_geometries(north, south, east, west, tags)
-            self.statusBar().showMessage("Processing building data...", 5000)
-            self.buildings_gdf = mark_critical_infrastructure(self.buildings_gdf)
+            self.buildings_gdf = buildings_gdf
             count = len(self.buildings_gdf) if self.buildings_gdf is not None else 0
             print(f"Buildings GDF loaded, count: {count}")
 
-            self.map_canvas.axes.clear()
-            self.map_canvas.axes.imshow(self.dem_array, cmap='gray', origin='upper', extent=self.wgs84_extent)
+            self.map_canvas.clear_overlays()
+            self._flood_mask = None
 
 
             if self.roads_gdf is not None and not self.roads_gdf.empty:
-                projected_roads = self.roads_gdf.to_crs(self.dem_crs)
-                self.map_canvas.plot_geodataframe(projected_roads, edgecolor='grey', zorder=2)
-                
+                projected_roads = self._to_dem_crs("roads", self.roads_gdf)
+                self._layer_artists["roads"] = self.map_canvas.plot_geodataframe(
+                    projected_roads, edgecolor='grey', zorder=2)
+
             if self.buildings_gdf is not None and not self.buildings_gdf.empty:
                 QMessageBox.information(self, "OSM Data Loaded", f"Successfully fetched {count} building geometries.")
 
                 if self.buildings_gdf.crs is None:
                     self.buildings_gdf.set_crs("EPSG:4326", inplace=True)
 
-                projected_gdf = self.buildings_gdf.to_crs(self.dem_crs)
-                self.map_canvas.plot_geodataframe(projected_gdf, facecolor='none', edgecolor='blue', linewidth=0.5, zorder=3)
+                projected_gdf = self._to_dem_crs("buildings", self.buildings_gdf)
+                self._layer_artists["buildings"] = self.map_canvas.plot_geodataframe(
+                    projected_gdf, facecolor='none', edgecolor='blue', linewidth=0.5, zorder=3)
             else:
                 QMessageBox.warning(self, "OSM Data", "No building geometries were found for the given area.")
 
             self.map_canvas.axes.set_xlabel("Longitude")
             self.map_canvas.axes.set_ylabel("Latitude")
-            self.map_canvas.fig.tight_layout()
             self.map_canvas.draw()
             self.statusBar().showMessage(f"Loaded {count} buildings.", 5000)
         except Exception as e:
-            error_message = f"Failed to fetch OSM data: {e}"
-            print(error_message)
-            QMessageBox.critical(self, "OSM Load Error", error_message)
-            self.buildings_gdf = None
-            self.statusBar().showMessage("Failed to load building data.", 5000)
+            self._on_buildings_error(str(e))
+
+    def _on_buildings_error(self, message):
+        self._buildings_worker = None
+        self.load_osm_button.setEnabled(True)
+        error_message = f"Failed to fetch OSM data: {message}"
+        print(error_message)
+        QMessageBox.critical(self, "OSM Load Error", error_message)
+        self.buildings_gdf = None
+        self.statusBar().showMessage("Failed to load building data.", 5000)
+
+    def _to_dem_crs(self, layer, gdf):
+        # Layers are re-plotted after every analysis, so keep each one projected to the DEM CRS.
+        # The result is only drawn, so vertices closer than half a DEM cell are simplified away.
+        tolerance = abs(self.dem_transform.a) * 0.5 if self.dem_transform is not None else 0.0
+        key = (self.dem_crs, tolerance, self.wgs84_extent)
+        cached = self._projected_layers.get(layer)
+        if cached is not None and cached[0] is gdf and cached[1] == key:
+            return cached[2]
+        if self.wgs84_extent is not None and gdf.crs is not None:
+            # Only features over the DEM can be drawn, so drop the rest before projecting.
+            west, east, south, north = self.wgs84_extent
+            dem_bounds = box(*rasterio.warp.transform_bounds("EPSG:4326", gdf.crs, west, south, east, north))
+            visible = gdf.iloc[np.sort(gdf.sindex.query(dem_bounds, predicate='intersects'))]
+        else:
+            visible = gdf
+        projected = visible.to_crs(self.dem_crs)
+        if tolerance > 0:
+            projected[projected.geometry.name] = projected.geometry.simplify(tolerance)
+        self._projected_layers[layer] = (gdf, key, projected)
+        return projected
+
+    def _layer_overlay(self, layer, gdf, **style):
+        # Restyle the collections drawn when the layer was loaded, rather than plotting
+        # every geometry again; they only need re-plotting once the axes were cleared.
+        artists = self._layer_artists.get(layer, [])
+        if not artists or any(artist.axes is None for artist in artists):
+            return self.map_canvas.plot_geodataframe(self._to_dem_crs(layer, gdf), animated=True, **style)
+        for artist in artists:
+            artist.set(**style)
+        self.map_canvas.add_animated(artists)
+        return artists
+
+    def _analysis_layer(self, layer, gdf, geom_types, cache_updates):
+        # Keep each layer's geometry-type subset between runs, so its spatial index
+        # (built on first use by find_intersecting_features) is reused for every sea level.
+        cached = self._analysis_layers.get(layer)
+        if cached is not None and cached[0] is gdf:
+            return cached[1]
+        subset = gdf[gdf.geometry.type.isin(geom_types)]
+        cache_updates.setdefault("analysis_layers", {})[layer] = (gdf, subset)
+        return subset
+
+    def _total_hospitals(self, buildings_gdf, cache_updates):
+        # The total only changes with the buildings layer, unlike the flooded count.
+        cached = self._hospital_total
+        if cached is not None and cached[0] is buildings_gdf:
+            return cached[1]
+        n_total_hospitals = int(np.count_nonzero(buildings_gdf["amenity"].to_numpy() == "hospital"))
+        cache_updates["hospital_total"] = (buildings_gdf, n_total_hospitals)
+        return n_total_hospitals
+
+    def _roads_length_crs(self, roads_gdf, dem_crs, cache_updates):
+        # A DEM projected in metres measures lengths directly; otherwise use the UTM zone of
+        # the roads layer, looked up once per layer rather than querying PROJ every run.
+        if dem_crs is not None and dem_crs.is_projected and dem_crs.linear_units == "metre":
+            return dem_crs
+        cached = self._roads_utm
+        if cached is not None and cached[0] is roads_gdf:
+            return cached[1]
+        west, south, east, north = roads_gdf.to_crs("EPSG:4326").total_bounds
+        lon, lat = (west + east) / 2, (south + north) / 2
+        utm_crs = pyproj.CRS.from_user_input(pyproj.database.query_utm_crs_info(
+            datum_name="WGS 84",
+            area_of_interest=pyproj.aoi.AreaOfInterest(
+                west_lon_degree=lon,
+                south_lat_degree=lat,
+                east_lon_degree=lon,
+                north_lat_degree=lat,
+            ),
+        )[0].code)
+        cache_updates["roads_utm"] = (roads_gdf, utm_crs)
+        return utm_crs
 
     def _load_osm_roads(self):
         bbox = self._get_bbox_from_inputs()
@@ -272,15 +600,26 @@ class CoraGUI(QMainWindow):
             return
 
         tags = {"highway": True}
-        self.statusBar().showMessage("Fetching OSM road data...", 5000)
+        self.statusBar().showMessage("Fetching OSM road data...")
+        print(f"Fetching OSM road data for bbox: N={north}, S={south}, E={east}, W={west}")
+        worker = Worker(fetch_osm_geometries, north, south, east, west, tags)
+        worker.signals.finished.connect(self._on_roads_ready)
+        worker.signals.error.connect(self._on_roads_error)
+        self._roads_worker = worker
+        self.load_roads_button.setEnabled(False)
+        worker.start()
+
+    def _on_roads_ready(self, roads_gdf):
+        self._roads_worker = None
+        self.load_roads_button.setEnabled(True)
+        self.statusBar().clearMessage()
         try:
-            print(f"Fetching OSM road data for bbox: N={north}, S={south}, E={east}, W={west}")
-            self.roads_gdf = fetch_osm_geometries(north, south, east, west, tags)
+            self.roads_gdf = roads_gdf
             count = len(self.roads_gdf) if self.roads_gdf is not None else 0
             print(f"Roads GDF loaded, count: {count}")
 
-            self.map_canvas.axes.clear()
-            self.map_canvas.axes.imshow(self.dem_array, cmap='gray', origin='upper', extent=self.wgs84_extent)
+            self.map_canvas.clear_overlays()
+            self._flood_mask = None
 
             if self.roads_gdf is not None and not self.roads_gdf.empty:
                 QMessageBox.information(self, "OSM Roads Loaded", f"Successfully fetched {count} road geometries.")
@@ -288,226 +627,447 @@ class CoraGUI(QMainWindow):
                 if self.roads_gdf.crs is None:
                     self.roads_gdf.set_crs("EPSG:4326", inplace=True)
 
-                projected_gdf = self.roads_gdf.to_crs(self.dem_crs)
-                self.map_canvas.plot_geodataframe(projected_gdf, edgecolor='grey', zorder=2)
+                projected_gdf = self._to_dem_crs("roads", self.roads_gdf)
+                self._layer_artists["roads"] = self.map_canvas.plot_geodataframe(
+                    projected_gdf, edgecolor='grey', zorder=2)
             else:
                 QMessageBox.warning(self, "OSM Roads", "No road geometries were found for the given area.")
 
 
             if self.buildings_gdf is not None and not self.buildings_gdf.empty:
-                projected_buildings = self.buildings_gdf.to_crs(self.dem_crs)
-                self.map_canvas.plot_geodataframe(projected_buildings, facecolor='none', edgecolor='blue', linewidth=0.5, zorder=3)
+                projected_buildings = self._to_dem_crs("buildings", self.buildings_gdf)
+                self._layer_artists["buildings"] = self.map_canvas.plot_geodataframe(
+                    projected_buildings, facecolor='none', edgecolor='blue', linewidth=0.5, zorder=3)
 
             self.map_canvas.axes.set_xlabel("Longitude")
             self.map_canvas.axes.set_ylabel("Latitude")
-            self.map_canvas.fig.tight_layout()
             self.map_canvas.draw()
             self.statusBar().showMessage(f"Loaded {count} roads.", 5000)
         except Exception as e:
-            error_message = f"Failed to fetch OSM road data: {e}"
-            print(error_message)
-            QMessageBox.critical(self, "OSM Load Error", error_message)
-            self.roads_gdf = None
-            self.statusBar().showMessage("Failed to load road data.", 5000)
+            self._on_roads_error(str(e))
+
+    def _on_roads_error(self, message):
+        self._roads_worker = None
+        self.load_roads_button.setEnabled(True)
+        error_message = f"Failed to fetch OSM road data: {message}"
+        print(error_message)
+        QMessageBox.critical(self, "OSM Load Error", error_message)
+        self.roads_gdf = None
+        self.statusBar().showMessage("Failed to load road data.", 5000)
 
     def _on_slr_slider_changed(self, value):
         slr_meters = value / 100.0
         self.slr_value_label.setText(f"{slr_meters:.2f}m")
+        self._slr_timer.start()
+
+    def _on_slr_slider_released(self):
+        self._slr_timer.stop()
+        self._run_slr_preview()
+
+    def _run_slr_preview(self):
+        if self.dem_array is not None:
+            self._start_analysis(notify=False)
 
     def _load_dem_via_dialog(self):
-        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-        start_dir = data_dir if os.path.isdir(data_dir) else os.path.expanduser("~")
+        if self._dem_dialog_dir is None:
+            self._dem_dialog_dir = DATA_DIR if os.path.isdir(DATA_DIR) else os.path.expanduser("~")
 
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Open DEM File",
-            start_dir,
-            "GeoTIFF Files (*.tif *.tiff);;All Files (*)"
+            self._dem_dialog_dir,
+            "GeoTIFF Files (*.tif *.tiff);;All Files (*)",
+            options=QFileDialog.Option.ReadOnly | QFileDialog.Option.DontUseCustomDirectoryIcons
         )
 
         if not file_path:
             return
 
         self.current_dem_path = file_path
+        self._dem_dialog_dir = os.path.dirname(file_path)
 
         try:
             print(f"Loading DEM from: {self.current_dem_path}...")
-            self.dem_array, self.dem_transform, self.dem_crs = load_dem(self.current_dem_path)
-            print(f"DEM loaded successfully. Shape: {self.dem_array.shape}, Transform: {self.dem_transform}, CRS: {self.dem_crs}")
-
-            if self.dem_array is not None:
-                self.map_canvas.axes.clear()
-                
-                height, width = self.dem_array.shape
-                extent = rasterio.transform.array_bounds(height, width, self.dem_transform)
-
-                src_crs = self.dem_crs
-                dst_crs = pyproj.CRS("EPSG:4326")
-                transformer = pyproj.Transformer.from_crs(src_crs, dst_crs, always_xy=True)
-                west, south = transformer.transform(extent[0], extent[1])
-                east, north = transformer.transform(extent[2], extent[3])
-
-                self.wgs84_extent = [west, east, south, north]
-                self.map_canvas.axes.imshow(self.dem_array, cmap='gray', origin='upper', extent=self.wgs84_extent)
-                self.map_canvas.axes.set_title(f"Loaded DEM: {os.path.basename(self.current_dem_path)}")
-                self.map_canvas.axes.set_xlabel("Longitude")
-                self.map_canvas.axes.set_ylabel("Latitude")
-                self.map_canvas.fig.tight_layout()
-                self.map_canvas.draw()
-                QMessageBox.information(self, "DEM Loaded",
-                                        f"DEM '{os.path.basename(self.current_dem_path)}' loaded successfully.")
-            else:
-                QMessageBox.critical(self, "DEM Load Error", "DEM data is None after loading attempt.")
-                print("DEM data is None after loading attempt.")
-                self.current_dem_path = None
+            with rasterio.open(self.current_dem_path) as src:
+                has_overviews = bool(src.overviews(1))
+            # Results and queued re-runs for the previous DEM are dropped from here on.
+            self.dem_array = None
+            self._analysis_pending = None
+            if has_overviews:
+                # Show an overview straight away while full resolution pages in.
+                overview, overview_transform, overview_crs = load_dem_overview(
+                    self.current_dem_path, self.map_canvas.axes_pixel_size())
+                self._display_dem(overview, overview_transform, overview_crs)
+            self.statusBar().showMessage("Loading DEM...")
+            worker = Worker(load_dem_memmap, self.current_dem_path)
+            worker.signals.finished.connect(lambda dem: self._on_dem_loaded(dem, display=not has_overviews))
+            worker.signals.error.connect(self._on_dem_error)
+            self._dem_worker = worker
+            self.load_dem_button.setEnabled(False)
+            self.analyze_button.setEnabled(False)
+            worker.start()
 
         except FileNotFoundError:
             QMessageBox.critical(self, "DEM Load Error", f"DEM file not found at '{self.current_dem_path}'.")
             print(f"Error: DEM file not found at '{self.current_dem_path}'.")
-            self.dem_array = None
-            self.dem_transform = None
-            self.dem_crs = None
-            self.current_dem_path = None
+            self._reset_dem()
         except Exception as e:
-            QMessageBox.critical(self, "DEM Load Error",
-                                 f"An error occurred while loading DEM '{os.path.basename(self.current_dem_path)}': {e}")
-            print(f"An error occurred while loading DEM: {e}")
-            self.dem_array = None
-            self.dem_transform = None
-            self.dem_crs = None
-            self.current_dem_path = None
+            self._on_dem_error(str(e))
+
+    def _display_dem(self, display_array, transform, crs):
+        height, width = display_array.shape
+        extent = rasterio.transform.array_bounds(height, width, transform)
+
+        if crs != self._to_wgs84_crs:
+            self._to_wgs84 = pyproj.Transformer.from_crs(crs, pyproj.CRS("EPSG:4326"), always_xy=True)
+            self._to_wgs84_crs = crs
+        # Densify the edges, since a projected DEM's edges are curves in WGS84.
+        west, south, east, north = self._to_wgs84.transform_bounds(*extent, densify_pts=21)
+
+        self.wgs84_extent = [west, east, south, north]
+        # Full-resolution DEMs are only decimated here; _refine_dem_view fits them to the view.
+        step = max(1, max(height, width) // self.map_canvas.axes_pixel_size())
+        display_array = display_array[::step, ::step]
+        self._dem_display = display_array
+        self._dem_display_extent = list(self.wgs84_extent)
+        # One normalization for the whole DEM keeps the contrast fixed as the view is refined.
+        self._dem_norm = Normalize(np.nanmin(display_array), np.nanmax(display_array))
+
+        self.map_canvas.axes.clear()
+        self._draw_dem_background()
+        self.map_canvas.axes.set_title(f"Loaded DEM: {os.path.basename(self.current_dem_path)}")
+        self.map_canvas.axes.set_xlabel("Longitude")
+        self.map_canvas.axes.set_ylabel("Latitude")
+        self.map_canvas.draw()
+
+    def _draw_dem_background(self):
+        # Callers clear the axes first, which also removes any flood overlay.
+        self._flood_mask = None
+        if self._dem_display is None:
+            return
+        axes = self.map_canvas.axes
+        self._dem_image = self.map_canvas.set_raster_background(self._dem_display, self._dem_display_extent,
+                                                                self._dem_norm)
+        # Axes.clear() drops its callbacks, so reconnect them with every new background.
+        axes.callbacks.connect('xlim_changed', self._refine_dem_view)
+        axes.callbacks.connect('ylim_changed', self._refine_dem_view)
+
+    def _view_window(self):
+        axes = self.map_canvas.axes
+        west, east, south, north = self.wgs84_extent
+        height, width = self.dem_array.shape
+        x_min, x_max = sorted(axes.get_xlim())
+        y_min, y_max = sorted(axes.get_ylim())
+
+        col_start = int(np.clip(np.floor((x_min - west) / (east - west) * width), 0, width - 1))
+        col_stop = int(np.clip(np.ceil((x_max - west) / (east - west) * width), col_start + 1, width))
+        row_start = int(np.clip(np.floor((north - y_max) / (north - south) * height), 0, height - 1))
+        row_stop = int(np.clip(np.ceil((north - y_min) / (north - south) * height), row_start + 1, height))
+
+        # Decimate the visible window to roughly one DEM cell per screen pixel.
+        bbox = axes.get_window_extent()
+        step = max(1, int(max((row_stop - row_start) / max(bbox.height, 1),
+                              (col_stop - col_start) / max(bbox.width, 1))))
+        row_stop = min(height, row_start + -(-(row_stop - row_start) // step) * step)
+        col_stop = min(width, col_start + -(-(col_stop - col_start) // step) * step)
+        window = (slice(row_start, row_stop, step), slice(col_start, col_stop, step))
+        extent = [
+            west + col_start * (east - west) / width,
+            west + col_stop * (east - west) / width,
+            north - row_stop * (north - south) / height,
+            north - row_start * (north - south) / height,
+        ]
+        return window, extent
+
+    def _refine_dem_view(self, axes=None):
+        if (self.dem_array is None or self._dem_image is None or self._dem_image.axes is None
+                or self._refining_dem_view):
+            return
+        window, self._dem_display_extent = self._view_window()
+        self._dem_display = self.dem_array[window]
+        self._refining_dem_view = True
+        try:
+            axes = self.map_canvas.axes
+            xlim, ylim = axes.get_xlim(), axes.get_ylim()
+            self.map_canvas.set_raster_background(self._dem_display, self._dem_display_extent, self._dem_norm)
+            if self._flood_mask is not None:
+                self.map_canvas.update_flood_mask(_block_any(self._flood_mask, window), extent=self._dem_display_extent)
+            axes.set_xlim(xlim)
+            axes.set_ylim(ylim)
+        finally:
+            self._refining_dem_view = False
+        self.map_canvas.draw_idle()
+
+    def _show_flood_mask(self, flood_mask):
+        self._flood_mask = flood_mask
+        window, extent = self._view_window()
+        self._refining_dem_view = True
+        try:
+            axes = self.map_canvas.axes
+            xlim, ylim = axes.get_xlim(), axes.get_ylim()
+            self.map_canvas.update_flood_mask(_block_any(flood_mask, window), extent=extent)
+            axes.set_xlim(xlim)
+            axes.set_ylim(ylim)
+        finally:
+            self._refining_dem_view = False
+
+    def _finish_dem_worker(self):
+        self._dem_worker = None
+        self.load_dem_button.setEnabled(True)
+        self.analyze_button.setEnabled(self._flood_worker is None)
+        self.statusBar().clearMessage()
+
+    def _on_dem_loaded(self, dem, display):
+        self._finish_dem_worker()
+        self.dem_array, self.dem_transform, self.dem_crs = dem
+        if display:
+            self._display_dem(*dem)
+        self._flood_levels = None
+        self._dem_version += 1
+        self._flood_polygons_cache.clear()
+        self._flood_impacts_cache.clear()
+        print(f"DEM loaded successfully. Shape: {self.dem_array.shape}, Transform: {self.dem_transform}, CRS: {self.dem_crs}")
+        self._refine_dem_view()
+        QMessageBox.information(self, "DEM Loaded",
+                                f"DEM '{os.path.basename(self.current_dem_path)}' loaded successfully.")
+
+    def _on_dem_error(self, message):
+        self._finish_dem_worker()
+        QMessageBox.critical(self, "DEM Load Error",
+                             f"An error occurred while loading DEM '{os.path.basename(self.current_dem_path)}': {message}")
+        print(f"An error occurred while loading DEM: {message}")
+        self._reset_dem()
+
+    def _reset_dem(self):
+        self.dem_array = None
+        self._flood_levels = None
+        self.dem_transform = None
+        self.dem_crs = None
+        self.current_dem_path = None
 
     def _run_analysis(self):
         if self.dem_array is None:
             QMessageBox.warning(self, "Analysis Error", "No DEM loaded. Please load a DEM file first.")
             return
+        self._start_analysis(notify=True)
+
+    def _start_analysis(self, notify):
+        if self.dem_array is None:
+            return
+        if self._flood_worker is not None:
+            # Re-run with the latest settings once the current analysis finishes.
+            self._analysis_pending = bool(self._analysis_pending) or notify
+            return
 
         slr_value_cm = self.slr_slider.value()
         slr_value_meters = slr_value_cm / 100.0
-        print(f"Running analysis with SLR: {slr_value_meters:.2f}m")
-
-        try:
-            dem_to_analyze = self.dem_array
-            if self.sea_wall_geometry is not None and len(self.sea_wall_points) >= 2:
-                try:
-                    wall_height_str = self.wall_height_input.text()
-                    wall_height = float(wall_height_str)
-                except Exception:
-                    wall_height = 3.0
-                dem_to_analyze = apply_sea_wall(
-                    dem_to_analyze,
-                    self.sea_wall_geometry,
-                    wall_height,
-                    self.dem_transform
-                )
-                print(f"Applied sea wall at height {wall_height}m.")
-
-            flood_mask = connected_flood(dem_to_analyze, slr_value_meters)
-            print(f"Flood analysis complete. Flooded cells: {np.sum(flood_mask)}")
-
-            height, width = self.dem_array.shape
-            extent = rasterio.transform.array_bounds(height, width, self.dem_transform)
-
-            src_crs = self.dem_crs
-            dst_crs = pyproj.CRS("EPSG:4326")
-            transformer = pyproj.Transformer.from_crs(src_crs, dst_crs, always_xy=True)
-            west, south = transformer.transform(extent[0], extent[1])
-            east, north = transformer.transform(extent[2], extent[3])
-            wgs84_extent = [west, east, south, north]
-
-            flood_polygons_gdf = raster_to_vector_polygons(flood_mask, self.dem_transform)
-            if hasattr(flood_polygons_gdf, 'set_crs') and (flood_polygons_gdf.crs is None):
-                flood_polygons_gdf.set_crs(self.dem_crs, inplace=True)
+        logger.debug("Running analysis with SLR: %.2fm", slr_value_meters)
 
-            if self.buildings_gdf is not None and not self.buildings_gdf.empty:
-                poly_buildings_gdf = self.buildings_gdf[
-                    self.buildings_gdf.geometry.type.isin(['Polygon', 'MultiPolygon'])
-                ]
-                if not poly_buildings_gdf.empty:
-                    flooded_buildings_gdf = find_intersecting_features(poly_buildings_gdf, flood_polygons_gdf)
-                    flooded_buildings_count = len(flooded_buildings_gdf)
-                    print(f"Flooded buildings count: {flooded_buildings_count}")
-                    self.flooded_buildings_label.setText(f"Flooded Buildings: {flooded_buildings_count}")
-
-                    if "is_critical" in flooded_buildings_gdf.columns:
-                        flooded_critical_gdf = flooded_buildings_gdf[flooded_buildings_gdf["is_critical"] == True]
-                    else:
-                        flooded_critical_gdf = flooded_buildings_gdf.iloc[0:0]  # Empty DataFrame if column missing
-
-                    flooded_critical_count = len(flooded_critical_gdf)
-                    print(f"Flooded critical infrastructure count: {flooded_critical_count}")
-                    self.flooded_critical_label.setText(f"Flooded Critical Infra: {flooded_critical_count}")
-
-                    if "amenity" in self.buildings_gdf.columns:
-                        total_hospitals = self.buildings_gdf[self.buildings_gdf["amenity"] == "hospital"]
-                        n_total_hospitals = len(total_hospitals)
-                        if n_total_hospitals > 0:
-                            flooded_hospitals = flooded_buildings_gdf[flooded_buildings_gdf["amenity"] == "hospital"]
-                            n_flooded_hospitals = len(flooded_hospitals)
-                            pct = (n_flooded_hospitals / n_total_hospitals) * 100
-                            self.flooded_hospitals_pct_label.setText(
-                                f"Flooded Hospitals: {n_flooded_hospitals}/{n_total_hospitals} ({pct:.1f}%)"
-                            )
-                        else:
-                            self.flooded_hospitals_pct_label.setText("Flooded Hospitals: 0/0 (0.0%)")
+        sea_wall = None
+        if self.sea_wall_geometry is not None and len(self.sea_wall_points) >= 2:
+            try:
+                wall_height_str = self.wall_height_input.text()
+                wall_height = float(wall_height_str)
+            except Exception:
+                wall_height = 3.0
+            sea_wall = (self.sea_wall_geometry, wall_height)
+
+        levels_key = (self._dem_version, None if sea_wall is None else (sea_wall[0].wkb, sea_wall[1]))
+        analysis_key = levels_key + (slr_value_cm,)
+        flood_levels = self._flood_levels if self._flood_levels_key == levels_key else None
+
+        # Everything but the drawing runs on the worker, so the slider stays responsive.
+        worker = Worker(self._analyze_flood, self.dem_array, self.dem_transform, self.dem_crs, sea_wall,
+                        slr_value_meters, flood_levels, analysis_key, self.buildings_gdf, self.roads_gdf)
+        worker.signals.finished.connect(
+            lambda result: self._on_flood_done(result, levels_key, analysis_key, slr_value_meters, notify))
+        worker.signals.error.connect(self._on_flood_error)
+        self._flood_worker = worker
+        # Slider previews over cached levels finish within a frame, so they leave the
+        # button and status bar alone instead of flickering them on every step.
+        self._flood_worker_shows_status = notify or flood_levels is None
+        if self._flood_worker_shows_status:
+            self.analyze_button.setEnabled(False)
+            self.statusBar().showMessage(f"Running flood analysis for SLR {slr_value_meters:.2f}m...")
+        worker.start()
+
+    def _finish_flood_worker(self):
+        self._flood_worker = None
+        if self._flood_worker_shows_status:
+            self.analyze_button.setEnabled(True)
+            self.statusBar().clearMessage()
+        if self._analysis_pending is not None:
+            notify = self._analysis_pending
+            self._analysis_pending = None
+            self._start_analysis(notify)
+
+    def _on_flood_error(self, message):
+        QMessageBox.critical(self, "Analysis Error", f"An error occurred during flood analysis: {message}")
+        print(f"An error occurred during flood analysis: {message}")
+        self._finish_flood_worker()
+
+    def _analyze_flood(self, dem, transform, crs, sea_wall, slr_value_meters, flood_levels, analysis_key,
+                       buildings_gdf, roads_gdf):
+        # Runs on a worker thread, so it never touches a widget and only reads the caches
+        # (with single atomic lookups). New cache entries are collected in cache_updates
+        # and stored by _store_analysis_caches on the GUI thread, the caches' only writer.
+        cache_updates = {}
+        if flood_levels is None and NUMBA_AVAILABLE:
+            flood_levels = _compute_flood_levels(dem, transform, sea_wall)
+        if flood_levels is not None:
+            # Each cell floods at the lowest sea level connecting it to the coast, so a
+            # new sea level over the same DEM and wall is a single comparison.
+            flood_mask = flood_levels <= slr_value_meters
+        else:
+            flood_mask = _compute_flood(dem, transform, slr_value_meters, sea_wall)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Flood analysis complete. Flooded cells: %d", np.count_nonzero(flood_mask))
+
+        # Revisiting a sea level with the same layers replays its impacts without any joins.
+        cached = self._flood_impacts_cache.get(analysis_key)
+        if cached is not None and cached[0] is buildings_gdf and cached[1] is roads_gdf:
+            return flood_mask, flood_levels, cached[2], cache_updates
+        # The polygons are only needed to intersect OSM layers, so skip them for a bare DEM.
+        if any(gdf is not None and not gdf.empty for gdf in (buildings_gdf, roads_gdf)):
+            flood_polygons_gdf = self._flood_polygons(flood_mask, analysis_key, transform, crs, cache_updates)
+        else:
+            flood_polygons_gdf = None
+        label_texts = self._assess_flood_impacts(flood_polygons_gdf, buildings_gdf, roads_gdf, crs, cache_updates)
+        cache_updates["flood_impacts"] = (buildings_gdf, roads_gdf, label_texts)
+        return flood_mask, flood_levels, label_texts, cache_updates
+
+    def _flood_polygons(self, flood_mask, analysis_key, transform, crs, cache_updates):
+        # Vectorising the mask is the costly step of a re-analysis, so keep the polygons of
+        # recently visited sea levels for each DEM and sea wall.
+        cached = self._flood_polygons_cache.get(analysis_key)
+        if cached is not None:
+            return cached
+        flood_polygons_gdf = raster_to_vector_polygons(flood_mask, transform)
+        if hasattr(flood_polygons_gdf, 'set_crs') and (flood_polygons_gdf.crs is None):
+            flood_polygons_gdf.set_crs(crs, inplace=True)
+        cache_updates["flood_polygons"] = flood_polygons_gdf
+        return flood_polygons_gdf
+
+    def _store_analysis_caches(self, analysis_key, cache_updates):
+        # Called on the GUI thread once an analysis is accepted; see _analyze_flood.
+        self._analysis_layers.update(cache_updates.get("analysis_layers", {}))
+        if "hospital_total" in cache_updates:
+            self._hospital_total = cache_updates["hospital_total"]
+        if "roads_utm" in cache_updates:
+            self._roads_utm = cache_updates["roads_utm"]
+        for name, cache in (("flood_polygons", self._flood_polygons_cache),
+                            ("flood_impacts", self._flood_impacts_cache)):
+            if name in cache_updates:
+                cache[analysis_key] = cache_updates[name]
+            elif analysis_key not in cache:
+                continue
+            cache.move_to_end(analysis_key)
+            if len(cache) > FLOOD_POLYGON_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    def _assess_flood_impacts(self, flood_polygons_gdf, buildings_gdf, roads_gdf, crs, cache_updates):
+        """Returns the new text of each impact label, keyed by the label's attribute name."""
+        label_texts = {}
+        if buildings_gdf is not None and not buildings_gdf.empty:
+            poly_buildings_gdf = self._analysis_layer("buildings", buildings_gdf, ['Polygon', 'MultiPolygon'],
+                                                      cache_updates)
+            if not poly_buildings_gdf.empty:
+                # Only counts are reported, so take the flooded rows' positions and skip
+                # building the intersection geometries.
+                flooded_idx = find_intersecting_indices(poly_buildings_gdf, flood_polygons_gdf)
+                flooded_buildings_count = len(flooded_idx)
+                logger.debug("Flooded buildings count: %d", flooded_buildings_count)
+                label_texts["flooded_buildings_label"] = f"Flooded Buildings: {flooded_buildings_count}"
+
+                # Count with plain array comparisons rather than building filtered frames.
+                if "is_critical" in poly_buildings_gdf.columns:
+                    flooded_critical_count = int(np.count_nonzero(poly_buildings_gdf["is_critical"].to_numpy()[flooded_idx] == True))
+                else:
+                    flooded_critical_count = 0
+
+                logger.debug("Flooded critical infrastructure count: %d", flooded_critical_count)
+                label_texts["flooded_critical_label"] = f"Flooded Critical Infra: {flooded_critical_count}"
+
+                if "amenity" in buildings_gdf.columns:
+                    n_total_hospitals = self._total_hospitals(buildings_gdf, cache_updates)
+                    if n_total_hospitals > 0:
+                        n_flooded_hospitals = int(np.count_nonzero(poly_buildings_gdf["amenity"].to_numpy()[flooded_idx] == "hospital"))
+                        pct = (n_flooded_hospitals / n_total_hospitals) * 100
+                        label_texts["flooded_hospitals_pct_label"] = (
+                            f"Flooded Hospitals: {n_flooded_hospitals}/{n_total_hospitals} ({pct:.1f}%)"
+                        )
                     else:
-                        self.flooded_hospitals_pct_label.setText("Flooded Hospitals: N/A")
+                        label_texts["flooded_hospitals_pct_label"] = "Flooded Hospitals: 0/0 (0.0%)"
                 else:
-                    print("No polygonal buildings to analyze for flooding.")
-                    self.flooded_buildings_label.setText("Flooded Buildings: N/A")
+                    label_texts["flooded_hospitals_pct_label"] = "Flooded Hospitals: N/A"
             else:
-                self.flooded_buildings_label.setText("Flooded Buildings: N/A")
-
-            if self.roads_gdf is not None and not self.roads_gdf.empty:
-                line_roads_gdf = self.roads_gdf[
-                    self.roads_gdf.geometry.type.isin(['LineString', 'MultiLineString'])
-                ]
-                if not line_roads_gdf.empty:
-                    flooded_roads_gdf = find_intersecting_features(line_roads_gdf, flood_polygons_gdf)
-                    if flooded_roads_gdf.crs is None:
-                        flooded_roads_gdf.set_crs(self.dem_crs, inplace=True)
-                    try:
-                        centroid = flooded_roads_gdf.unary_union.centroid
-                        utm_crs = pyproj.CRS.from_user_input(pyproj.database.query_utm_crs_info(
-                            datum_name="WGS 84",
-                            area_of_interest=pyproj.aoi.AreaOfInterest(
-                                west_lon_degree=centroid.x,
-                                south_lat_degree=centroid.y,
-                                east_lon_degree=centroid.x,
-                                north_lat_degree=centroid.y,
-                            ),
-                        )[0].code)
-                        flooded_roads_proj = flooded_roads_gdf.to_crs(utm_crs)
-                        total_length_m = flooded_roads_proj.geometry.length.sum()
-                        total_length_km = total_length_m / 1000.0
-                        print(f"Flooded roads total length: {total_length_km:.2f} km")
-                        self.flooded_roads_label.setText(f"Flooded Roads (km): {total_length_km:.2f}")
-                    except Exception as e:
-                        print(f"Could not project flooded roads for length calculation: {e}")
-                        total_length = flooded_roads_gdf.geometry.length.sum()
-                        self.flooded_roads_label.setText(f"Flooded Roads: {total_length:.2f} (map units)")
-                else:
-                    print("No linear roads to analyze for flooding.")
-                    self.flooded_roads_label.setText("Flooded Roads (km): N/A")
+                logger.debug("No polygonal buildings to analyze for flooding.")
+                label_texts["flooded_buildings_label"] = "Flooded Buildings: N/A"
+        else:
+            label_texts["flooded_buildings_label"] = "Flooded Buildings: N/A"
+
+        if roads_gdf is not None and not roads_gdf.empty:
+            line_roads_gdf = self._analysis_layer("roads", roads_gdf, ['LineString', 'MultiLineString'],
+                                                 cache_updates)
+            if not line_roads_gdf.empty:
+                flooded_roads_gdf = find_intersecting_features(line_roads_gdf, flood_polygons_gdf)
+                if flooded_roads_gdf.crs is None:
+                    flooded_roads_gdf.set_crs(crs, inplace=True)
+                try:
+                    length_crs = self._roads_length_crs(roads_gdf, crs, cache_updates)
+                    flooded_roads_proj = flooded_roads_gdf.to_crs(length_crs)
+                    total_length_m = flooded_roads_proj.geometry.length.sum()
+                    total_length_km = total_length_m / 1000.0
+                    logger.debug("Flooded roads total length: %.2f km", total_length_km)
+                    label_texts["flooded_roads_label"] = f"Flooded Roads (km): {total_length_km:.2f}"
+                except Exception as e:
+                    print(f"Could not project flooded roads for length calculation: {e}")
+                    total_length = flooded_roads_gdf.geometry.length.sum()
+                    label_texts["flooded_roads_label"] = f"Flooded Roads: {total_length:.2f} (map units)"
             else:
-                self.flooded_roads_label.setText("Flooded Roads (km): N/A")
-
-            self.map_canvas.plot_flood_mask(flood_mask, extent=self.wgs84_extent)
-            self.map_canvas.axes.set_xlabel("Longitude")
-            self.map_canvas.axes.set_ylabel("Latitude")
-
-            if self.roads_gdf is not None and not self.roads_gdf.empty:
-                projected_roads = self.roads_gdf.to_crs(self.dem_crs)
-                self.map_canvas.plot_geodataframe(projected_roads, edgecolor='grey', zorder=2)
-            if self.buildings_gdf is not None and not self.buildings_gdf.empty:
-                projected_buildings = self.buildings_gdf.to_crs(self.dem_crs)
-                self.map_canvas.plot_geodataframe(projected_buildings, facecolor='red', edgecolor='red', alpha=0.5, zorder=3)
+                logger.debug("No linear roads to analyze for flooding.")
+                label_texts["flooded_roads_label"] = "Flooded Roads (km): N/A"
+        else:
+            label_texts["flooded_roads_label"] = "Flooded Roads (km): N/A"
+        return label_texts
 
-            QMessageBox.information(self, "Analysis Complete", f"Flood risk analysis finished for SLR {slr_value_meters:.2f}m.")
+    def _on_flood_done(self, result, levels_key, analysis_key, slr_value_meters, notify):
+        try:
+            flood_mask, flood_levels, label_texts, cache_updates = result
+            if self.dem_array is None or levels_key[0] != self._dem_version:
+                # A different DEM was loaded (or is loading) since this analysis started.
+                return
+            self._store_analysis_caches(analysis_key, cache_updates)
+            if flood_levels is not None:
+                self._flood_levels = flood_levels
+                self._flood_levels_key = levels_key
+            for label_name, text in label_texts.items():
+                getattr(self, label_name).setText(text)
+
+            self._show_flood_mask(flood_mask)
+
+            # The overlays do not depend on the sea level, so slider runs keep the same artists.
+            overlays_source = self._analysis_overlays_source
+            if (overlays_source is None or overlays_source[0] is not self.roads_gdf
+                    or overlays_source[1] is not self.buildings_gdf or overlays_source[2] != self.dem_crs
+                    or any(artist.axes is None for artist in self._analysis_overlays)):
+                self.map_canvas.remove_artists(self._analysis_overlays)
+                self._analysis_overlays = []
+                if self.roads_gdf is not None and not self.roads_gdf.empty:
+                    self._analysis_overlays += self._layer_overlay("roads", self.roads_gdf, edgecolor='grey', zorder=2)
+                if self.buildings_gdf is not None and not self.buildings_gdf.empty:
+                    self._analysis_overlays += self._layer_overlay(
+                        "buildings", self.buildings_gdf, facecolor='red', edgecolor='red', alpha=0.5, zorder=3)
+                self._analysis_overlays_source = (self.roads_gdf, self.buildings_gdf, self.dem_crs)
+
+            if notify:
+                QMessageBox.information(self, "Analysis Complete", f"Flood risk analysis finished for SLR {slr_value_meters:.2f}m.")
 
         except Exception as e:
             QMessageBox.critical(self, "Analysis Error", f"An error occurred during flood analysis: {e}")
             print(f"An error occurred during flood analysis: {e}")
+        finally:
+            self._finish_flood_worker()
 
     def _toggle_drawing_mode(self):
         self.is_drawing_wall = not self.is_drawing_wall
@@ -548,7 +1108,9 @@ class CoraGUI(QMainWindow):
         if len(self.sea_wall_points) >= 2:
             x, y = zip(*self.sea_wall_points)
             self.sea_wall_plot = self.map_canvas.axes.plot(x, y, color='orange', linewidth=2, marker='o', zorder=10)
-        self.map_canvas.draw()
+            self.map_canvas.add_animated(self.sea_wall_plot)
+        else:
+            self.map_canvas.draw()
 
     def _clear_sea_wall(self):
         self.sea_wall_points = []
@@ -558,17 +1120,21 @@ class CoraGUI(QMainWindow):
                 self.sea_wall_plot[0].remove()
             except Exception:
                 self.map_canvas.axes.clear()
-                if self.dem_array is not None and hasattr(self, "wgs84_extent"):
-                    self.map_canvas.axes.imshow(self.dem_array, cmap='gray', origin='upper', extent=self.wgs84_extent)
+                self._draw_dem_background()
             self.sea_wall_plot = None
         self.map_canvas.draw()
         self.statusBar().showMessage("Sea wall cleared.", 3000)
 
 def main():
-    app = QApplication(sys.argv)
-    ex = CoraGUI()
-    ex.show()
-    sys.exit(app.exec())
+    # Bound GDAL's block cache (default 5% of RAM) for the life of the app; DEMs are
+    # decoded once into the memory-mapped sidecar, so a large cache buys little.
+    with rasterio.Env(GDAL_CACHEMAX=128, VSI_CACHE=True, VSI_CACHE_SIZE=64 * 1024 * 1024,
+                      CPL_VSIL_CURL_ALLOWED_EXTENSIONS='.tif,.tiff,.ovr'):
+        app = QApplication(sys.argv)
+        ex = CoraGUI()
+        ex.show()
+        QTimer.singleShot(0, lambda: Worker(_warm_up_flood_model).start())
+        sys.exit(app.exec())
 
 
 if __name__ == '__main__':
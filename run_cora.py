@@ -1,23 +1,8 @@
 import argparse
+import contextlib
+import math
+import os
 import sys
-try:
-    from cora.utils.data_loader import load_dem
-    from cora.core.flood_model import bathtub_inundation
-    from cora.utils.visualization import export_flood_map_png
-except ImportError as e:
-    print(f"Error: Could not import CORA modules. {e}")
-    print("Please ensure that the 'cora' package is correctly structured and accessible.")
-
-    def load_dem():
-        raise ModuleNotFoundError("Cannot load DEM: Required CORA module not found")
-
-    def bathtub_inundation():
-        raise ModuleNotFoundError("Cannot perform inundation: Required CORA module not found")
-
-    def export_flood_map_png():
-        raise ModuleNotFoundError("Cannot export flood map: Required CORA module not found")
-
-    sys.exit(1)
 
 
 def main():
@@ -28,57 +13,202 @@ def main():
     parser.add_argument(
         "--dem_path",
         required=True,
-        help="Path to the Digital Elevation Model (DEM) GeoTIFF file."
+        help="Path or URL (http(s)://, s3://) of the Digital Elevation Model (DEM) GeoTIFF file, "
+             "or '-' to read it from stdin."
     )
     parser.add_argument(
         "--sea_level",
         type=float,
+        nargs="+",
         required=True,
-        help="Sea level value (in units consistent with DEM) for inundation analysis."
+        help="Sea level value(s) (in units consistent with DEM) for inundation analysis. "
+             "Several levels are evaluated in one pass over the DEM."
     )
     parser.add_argument(
         "--output_path",
         required=True,
-        help="Path to save the output flood map PNG file."
+        help="Path to save the output flood map: a PNG file, or a Cloud Optimized GeoTIFF with "
+             "overviews if it ends in .tif/.tiff. With several sea levels, each "
+             "map is saved with the level appended to the file name, e.g. map_1.5.png."
+    )
+    parser.add_argument(
+        "--tile_size",
+        type=int,
+        default=1024,
+        help="Approximate tile size in cells; the DEM is read and thresholded one tile at a time."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Number of threads reading and decoding DEM tiles ahead of the threshold pass; "
+             "read-ahead is also capped at about 256 MB of tile data."
+    )
+    parser.add_argument(
+        "--gdal_cache",
+        type=int,
+        default=256,
+        help="GDAL block cache size in MB (GDAL_CACHEMAX)."
+    )
+    parser.add_argument(
+        "--no_stats",
+        action="store_true",
+        help="Skip counting flooded cells and the statistics line."
+    )
+    parser.add_argument(
+        "--dem_dtype",
+        choices=["auto", "float32"],
+        default="auto",
+        help="Tile dtype: 'auto' keeps integer DEMs (e.g. int16 SRTM) in their own type, "
+             "which compares exactly as float32 would at half the bytes; otherwise float32."
     )
 
     args = parser.parse_args()
 
+    output_paths = [args.output_path]
+    if len(args.sea_level) > 1:
+        output_root, output_ext = os.path.splitext(args.output_path)
+        output_paths = [f"{output_root}_{sea_level:g}{output_ext}" for sea_level in args.sea_level]
+        if len(set(output_paths)) != len(output_paths):
+            parser.error("--sea_level values must give distinct output file names "
+                         f"(got {', '.join(output_paths)}); remove duplicate or near-equal levels.")
+
+    # The heavy imports (NumPy, GDAL, Matplotlib) happen only after argument parsing,
+    # so --help and usage errors return immediately.
     try:
-        print(f"1. Loading DEM from: '{args.dem_path}'...")
-        dem_data, affine_transform = load_dem(args.dem_path)
-        print(f"   DEM loaded successfully. Shape: {dem_data.shape}, dtype: {dem_data.dtype}.")
-        if affine_transform:
-            print(f"   Affine transform: {affine_transform}")
-
-        print(f"2. Calculating bathtub inundation for sea level: {args.sea_level}...")
-        flood_mask = bathtub_inundation(dem_data, args.sea_level)
-        flooded_cell_count = flood_mask.sum()
-        total_cells = flood_mask.size
-        percentage_flooded = (flooded_cell_count / total_cells) * 100 if total_cells > 0 else 0
-        print(f"   Inundation calculated. Flooded cells: {flooded_cell_count}/{total_cells} "
-              f"({percentage_flooded:.2f}%).")
-
-        print(f"3. Exporting flood map to: '{args.output_path}'...")
-        export_flood_map_png(flood_mask, args.output_path)
-
-        print(f"\nProcessing complete. Flood map saved to '{args.output_path}'")
-
-    except FileNotFoundError:
-        print(f"Error: DEM file not found at '{args.dem_path}'. Please check the path.")
+        import numpy as np
+        import rasterio
+        from rasterio.errors import RasterioIOError
+        from rasterio.io import MemoryFile
+        from cora.utils.data_loader import load_dem_tiles
+        from cora.core.flood_model import bathtub_inundation_packed
+        from cora.utils.visualization import FloodMapPngWriter, export_flood_map_cog
+    except ImportError as e:
+        print(f"Error: Could not import CORA modules. {e}")
+        print("Please ensure that the 'cora' package is correctly structured and accessible.")
         sys.exit(1)
+
+    # A DEM piped on stdin is opened from GDAL's in-memory filesystem, so it is never
+    # written to a temporary file. URLs are streamed by GDAL with range requests.
+    dem_path = args.dem_path
+    stdin_dem = None
+    if dem_path == "-":
+        stdin_dem = MemoryFile(sys.stdin.buffer.read())
+        dem_path = stdin_dem.name
+
+    try:
+        # Each DEM block is decoded once, so a modest block cache is enough. For a URL,
+        # VSI_CACHE keeps fetched ranges and directory listings (a request each) are skipped.
+        # GDAL's own decode threads are shared out between the reader threads, so the two
+        # together do not oversubscribe the CPU.
+        gdal_threads = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+        gdal_options = dict(GDAL_CACHEMAX=args.gdal_cache, VSI_CACHE=True, GDAL_NUM_THREADS=gdal_threads)
+        if "://" in args.dem_path:
+            gdal_options.update(GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
+                                CPL_VSIL_CURL_ALLOWED_EXTENSIONS=".tif,.tiff,.ovr")
+        with rasterio.Env(**gdal_options):
+            print(f"1. Opening DEM: '{args.dem_path}'...")
+            try:
+                dem_src = rasterio.open(dem_path)
+            except FileNotFoundError:
+                print(f"Error: DEM file not found at '{args.dem_path}'. Please check the path.")
+                sys.exit(1)
+            with dem_src as src:
+                dem_shape = src.shape
+                affine_transform = src.transform
+                dem_crs = src.crs
+                block_rows, block_cols = src.block_shapes[0]
+                native_dtype = np.dtype(src.dtypes[0])
+            print(f"   DEM opened successfully. Shape: {dem_shape}.")
+            if affine_transform:
+                print(f"   Affine transform: {affine_transform}")
+
+            tile_dtype = np.dtype(np.float32)
+            if args.dem_dtype == "auto" and native_dtype.kind in "iu" and native_dtype.itemsize <= 2:
+                tile_dtype = native_dtype
+            print(f"   Tiles are read as {tile_dtype}.")
+
+            # Tiles are read ahead within a bounded memory budget (see load_dem_tiles); each
+            # tile is thresholded, bit-packed and counted in a single pass, one bit per cell.
+            # Tiles are whole internal blocks, so each is decoded once, and tile columns start
+            # on byte boundaries of the packed rows.
+            col_unit = math.lcm(block_cols, 8)
+            tile = (min(dem_shape[0], math.ceil(max(1, args.tile_size) / block_rows) * block_rows),
+                    min(dem_shape[1], math.ceil(max(1, args.tile_size) / col_unit) * col_unit))
+            sea_levels = args.sea_level
+            cog_outputs = [path.lower().endswith((".tif", ".tiff")) for path in output_paths]
+
+            print(f"2. Calculating bathtub inundation for sea level(s): {', '.join(map(str, sea_levels))} "
+                  f"in tiles of {tile[0]}x{tile[1]}...")
+            packed_width = (dem_shape[1] + 7) // 8
+            band_masks = [np.empty((tile[0], packed_width), dtype=np.uint8) for _ in sea_levels]
+            full_masks = [np.empty((dem_shape[0], packed_width), dtype=np.uint8) if is_cog else None
+                          for is_cog in cog_outputs]
+            flooded_cell_counts = [0] * len(sea_levels)
+            # Tiles are read on worker threads and thresholded here as they arrive in order;
+            # every sea level is evaluated on a tile while it is resident. Once a band of tile
+            # rows is complete it is streamed into the PNG encoders, so PNG outputs only ever
+            # hold one band of the mask; COG outputs keep the whole packed mask.
+            with contextlib.ExitStack() as png_writers_stack:
+                png_writers = [None if is_cog else png_writers_stack.enter_context(
+                                   FloodMapPngWriter(output_path, dem_shape[1], dem_shape[0]))
+                               for output_path, is_cog in zip(output_paths, cog_outputs)]
+                for dem_tile, _, core_window, _ in load_dem_tiles(dem_path, tile=tile, halo=0,
+                                                                  max_workers=args.workers, dtype=tile_dtype):
+                    band_slices = (slice(0, core_window.height),
+                                   slice(core_window.col_off // 8, (core_window.col_off + core_window.width + 7) // 8))
+                    for level_index, sea_level in enumerate(sea_levels):
+                        # The level is rounded to float32 as for a float32 tile, so integer tiles
+                        # are compared in float32 rather than promoted to float64.
+                        _, tile_count = bathtub_inundation_packed(dem_tile, np.float32(sea_level),
+                                                                  count=not args.no_stats,
+                                                                  out=band_masks[level_index][band_slices])
+                        if tile_count is not None:
+                            flooded_cell_counts[level_index] += tile_count
+                    if core_window.col_off + core_window.width < dem_shape[1]:
+                        continue
+                    for band_mask, full_mask, png_writer in zip(band_masks, full_masks, png_writers):
+                        band = band_mask[:core_window.height]
+                        if png_writer is not None:
+                            png_writer.write(band)
+                        else:
+                            full_mask[core_window.row_off:core_window.row_off + core_window.height] = band
+
+            total_cells = dem_shape[0] * dem_shape[1]
+            for sea_level, flooded_cell_count in zip(sea_levels, flooded_cell_counts):
+                if args.no_stats:
+                    print(f"   Inundation calculated for sea level {sea_level}.")
+                else:
+                    percentage_flooded = (flooded_cell_count / total_cells) * 100 if total_cells > 0 else 0
+                    print(f"   Inundation calculated for sea level {sea_level}. Flooded cells: "
+                          f"{flooded_cell_count}/{total_cells} ({percentage_flooded:.2f}%).")
+
+            if any(cog_outputs):
+                cog_paths = [path for path, is_cog in zip(output_paths, cog_outputs) if is_cog]
+                print(f"3. Exporting flood map(s) to: {', '.join(repr(path) for path in cog_paths)}...")
+                for full_mask, output_path in zip(full_masks, output_paths):
+                    if full_mask is not None:
+                        export_flood_map_cog(full_mask, output_path, affine_transform, dem_crs,
+                                             packed_width=dem_shape[1])
+
+            print(f"\nProcessing complete. Flood map(s) saved to: {', '.join(repr(path) for path in output_paths)}")
+
     except ImportError as import_error:
         print(f"Error: A required library is missing. {import_error}")
         sys.exit(1)
+    except RasterioIOError as rasterio_error:
+        print(f"Error reading DEM file '{args.dem_path}': {rasterio_error}")
+        print("Ensure the file is a valid GeoTIFF and accessible.")
+        sys.exit(1)
+    except TypeError as type_error:
+        print(f"Error: Invalid data type provided. {type_error}")
+        sys.exit(1)
     except Exception as exception_error:
-        if 'rasterio' in str(type(exception_error)).lower() and 'ioerror' in str(type(exception_error)).lower():
-            print(f"Error reading DEM file '{args.dem_path}': {exception_error}")
-            print("Ensure the file is a valid GeoTIFF and accessible.")
-        elif isinstance(exception_error, TypeError):
-            print(f"Error: Invalid data type provided. {exception_error}")
-        else:
-            print(f"An unexpected error occurred: {exception_error}")
+        print(f"An unexpected error occurred: {exception_error}")
         sys.exit(1)
+    finally:
+        if stdin_dem is not None:
+            stdin_dem.close()
 
 
 if __name__ == "__main__":